@@ -0,0 +1,174 @@
+import collections
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from feature_cache import task_feature_cache
+from scoring import CandidateMatrix, task_features
+from tracing import traced
+
+# Score given to (task, person) pairs that violate a shift constraint. Far below any
+# real score, so the solver only picks them when a task has no feasible person left.
+INFEASIBLE = -1e6
+# Batches with more (task, person) pairs than this are solved over each task's
+# ASSIGNMENT_CANDIDATES best feasible people instead of the full dense matrix,
+# scoring TASK_CHUNK tasks at a time.
+DENSE_PAIRS = 1_000_000
+ASSIGNMENT_CANDIDATES = 64
+TASK_CHUNK = 1024
+
+
+def is_free(individual):
+    return individual["available"] and individual["current_task"] is None
+
+
+def pending_task(task_description, urgency="Medium", task_shift="Any", due_date=None, required_quals=None):
+    # Same shape as the entries created in the Job Scheduling tab.
+    return {
+        "task_description": task_description,
+        "urgency": urgency,
+        "task_shift": task_shift,
+        "due_date": due_date,
+        "required_quals": required_quals or [],
+    }
+
+
+@traced
+def allocate_batch(tasks, individuals, model, feedback, embedding_store=None):
+    # Assigns a queue of tasks to free individuals in one shot by solving the
+    # assignment problem over the (tasks x people) score matrix, honouring shift,
+    # availability and one-task-per-person. Returns one (task, individual, score,
+    # explanation) tuple per task; individual is None when the task stays unassigned.
+    candidates = [ind for ind in individuals if is_free(ind)]
+    if not tasks:
+        return []
+    if not candidates:
+        return [(task, None, 0.0, {"reason": "No available individuals"}) for task in tasks]
+
+    task_embeddings = task_feature_cache.embeddings([task["task_description"] for task in tasks], model)
+    if embedding_store is not None:
+        skill_embeddings = embedding_store.embeddings_for(candidates, model)
+    else:
+        skill_embeddings = model.encode([ind["skills"] for ind in candidates])
+    matrix = CandidateMatrix(candidates, skill_embeddings, feedback)
+
+    features_list = []
+    for task, embedding in zip(tasks, task_embeddings):
+        features = task_features(task["task_description"], task.get("urgency", "Medium"), task.get("due_date"), embedding)
+        quals = [q.lower() for q in task.get("required_quals") or [] if q.lower() not in features["skills"]]
+        features["skills"] = features["skills"] + quals
+        features_list.append(features)
+
+    shifts = np.array([ind["shift"] for ind in candidates])
+    task_shifts = np.array([task.get("task_shift", "Any") for task in tasks])
+    shift_counts = collections.Counter(shifts.tolist())
+    feasible_counts = [len(candidates) if shift == "Any" else shift_counts.get(shift, 0) for shift in task_shifts]
+    if len(tasks) * len(candidates) <= DENSE_PAIRS:
+        chosen = assign_dense(matrix, features_list, shifts, task_shifts)
+        method = "optimal assignment (Hungarian)"
+    else:
+        chosen = assign_sparse(matrix, features_list, shifts, task_shifts)
+        method = f"optimal assignment over each task's {ASSIGNMENT_CANDIDATES} best candidates (sparse LAPJV)"
+
+    results = []
+    for row, task in enumerate(tasks):
+        placed = chosen.get(row)
+        if placed is None:
+            reason = "No available individuals in the requested shift" if not feasible_counts[row] \
+                else "All suitable individuals were assigned to higher-scoring tasks"
+            results.append((task, None, 0.0, {"reason": reason}))
+            continue
+        col, score = placed
+        individual = candidates[col]
+        explanation = {"candidate": individual["name"], "candidate_id": individual["id"]}
+        explanation.update(matrix.explain(features_list[row], col))
+        explanation["feasible_candidates"] = int(feasible_counts[row])
+        explanation["batch_size"] = len(tasks)
+        explanation["method"] = method
+        results.append((task, individual, score, explanation))
+    return results
+
+
+def feasible_mask(shifts, task_shifts):
+    return (task_shifts[:, None] == "Any") | (task_shifts[:, None] == shifts[None, :])
+
+
+def best_per_column(scores, n):
+    # Row indices of the n highest scores in every column, shape (n, columns).
+    if len(scores) <= n:
+        return np.broadcast_to(np.arange(len(scores))[:, None], scores.shape)
+    if n == 1:
+        return scores.argmax(axis=0)[None]
+    return np.argpartition(scores, -n, axis=0)[-n:]
+
+
+def assign_dense(matrix, features_list, shifts, task_shifts):
+    # Exact assignment over the full (tasks x people) matrix. Returns {row: (col, score)}.
+    feasible = feasible_mask(shifts, task_shifts)
+    scores = np.where(feasible, matrix.score_many(features_list), INFEASIBLE)
+    rows, cols = linear_sum_assignment(scores, maximize=True)
+    return {row: (col, float(scores[row, col])) for row, col in zip(rows, cols) if feasible[row, col]}
+
+
+def assign_sparse(matrix, features_list, shifts, task_shifts):
+    # Keeps the ASSIGNMENT_CANDIDATES best feasible people of every task and the best
+    # tasks of every person, then solves the assignment on that sparse graph. Keeping
+    # both sides means popular people do not crowd everyone else out of the graph.
+    # People keep ASSIGNMENT_CANDIDATES tasks scaled by the task-to-person ratio (at
+    # least one), so a short queue over a large roster stays a small graph.
+    # The smaller side is matched into the larger one plus one private "unassigned"
+    # column per row, priced above any real path, so a full matching always exists and
+    # as many pairs as possible are placed before scores are compared.
+    # Returns {row: (col, score)}.
+    n_tasks = len(features_list)
+    n_people = len(shifts)
+    k = min(ASSIGNMENT_CANDIDATES, n_people)
+    per_person = min(k, -(-k * n_tasks // n_people))
+    task_rows, cols, values = [], [], []
+    best_rows = np.zeros((0, n_people), dtype=np.intp)
+    best_scores = np.zeros((0, n_people), dtype=np.float32)
+    for start in range(0, n_tasks, TASK_CHUNK):
+        scores = matrix.score_many(features_list[start:start + TASK_CHUNK]).astype(np.float32, copy=False)
+        scores[~feasible_mask(shifts, task_shifts[start:start + TASK_CHUNK])] = -np.inf
+        top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        keep = np.isfinite(top_scores)
+        task_rows.append(np.nonzero(keep)[0] + start)
+        cols.append(top[keep])
+        values.append(top_scores[keep])
+        rows = best_per_column(scores, per_person)
+        best_rows = np.concatenate([best_rows, rows + start])
+        best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=0)])
+        if len(best_scores) > per_person:
+            rows = best_per_column(best_scores, per_person)
+            best_rows = np.take_along_axis(best_rows, rows, axis=0)
+            best_scores = np.take_along_axis(best_scores, rows, axis=0)
+    keep = np.isfinite(best_scores)
+    task_rows.append(best_rows[keep])
+    cols.append(np.nonzero(keep)[1])
+    values.append(best_scores[keep])
+    edge_keys, first = np.unique(np.concatenate(task_rows) * n_people + np.concatenate(cols), return_index=True)
+    task_rows, cols = np.divmod(edge_keys, n_people)
+    values = np.concatenate(values)[first].astype(np.float64)
+
+    # Costs are positive because the solver treats stored zeros as missing edges.
+    costs = (values.max() if len(values) else 0.0) + 1.0 - values
+    n_rows = min(n_tasks, n_people)
+    unassigned = n_rows * (costs.max() if len(costs) else 1.0) + 1.0
+    rows, others = (cols, task_rows) if n_people < n_tasks else (task_rows, cols)
+    n_others = max(n_tasks, n_people)
+    graph = csr_matrix(
+        (np.concatenate([costs, np.full(n_rows, unassigned)]),
+         (np.concatenate([rows, np.arange(n_rows)]), np.concatenate([others, n_others + np.arange(n_rows)]))),
+        shape=(n_rows, n_others + n_rows),
+    )
+    matched = min_weight_full_bipartite_matching(graph)[1]
+    placed = matched < n_others
+    if n_people < n_tasks:
+        task_of, person_of = matched[placed], np.nonzero(placed)[0]
+    else:
+        task_of, person_of = np.nonzero(placed)[0], matched[placed]
+    edge_at = np.searchsorted(edge_keys, task_of * n_people + person_of)
+    return {int(row): (int(col), float(values[edge])) for row, col, edge in zip(task_of, person_of, edge_at)}
@@ -0,0 +1,80 @@
+import json
+import urllib.error
+import urllib.request
+
+from engine import sync_roster
+
+
+class AllocationServiceError(RuntimeError):
+    pass
+
+
+class AllocationClient:
+    # Drop-in for AllocationEngine that sends matching, allocation and assignment to
+    # the allocation API (api.py), which owns the data directory. Individuals in the
+    # responses are resolved against the local roster, which is first brought up to
+    # date with the server's writes through the shared store.
+    def __init__(self, base_url, individuals, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.individuals = individuals
+        self.timeout = timeout
+
+    def _post(self, path, body):
+        request = urllib.request.Request(self.base_url + path, data=json.dumps(body).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            try:
+                message = json.loads(exc.read())["error"]
+            except (ValueError, KeyError, TypeError):
+                message = exc.reason
+            raise AllocationServiceError(f"Allocation API {path} failed ({exc.code}): {message}") from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise AllocationServiceError(f"Allocation API at {self.base_url} is unreachable: {exc}") from exc
+
+    def _task(self, task_description, urgency, task_shift, due_date):
+        return {"task_description": task_description, "urgency": urgency, "task_shift": task_shift,
+                "due_date": due_date.isoformat() if due_date else None}
+
+    def _individual(self, individual_id):
+        individual = self.individuals.get(individual_id)
+        if individual is None:
+            sync_roster(self.individuals)
+            individual = self.individuals.get(individual_id)
+        return individual
+
+    def match(self, task_description, urgency="Medium", task_shift="Any", due_date=None, limit=None):
+        body = self._task(task_description, urgency, task_shift, due_date)
+        if limit is not None:
+            body["limit"] = limit
+        ranked = []
+        for match in self._post("/match", body)["matches"]:
+            individual = self._individual(match["id"])
+            if individual is not None:
+                ranked.append((individual, match["score"]))
+        return ranked
+
+    def allocate(self, task_description, urgency="Medium", task_shift="Any", due_date=None):
+        # The app records the match itself, with the category the user entered.
+        body = dict(self._task(task_description, urgency, task_shift, due_date), record=False)
+        result = self._post("/allocate", body)
+        sync_roster(self.individuals)
+        if result["assigned"] is None:
+            return None, 0.0, result["explanation"], None
+        return (self._individual(result["assigned"]["id"]), result["assigned"]["score"], result["explanation"],
+                result["predicted_completion"])
+
+    def assign(self, individual, task_description, due_date=None, urgency="Medium", task_shift="Any"):
+        # Returns None if the individual was taken by another session first.
+        body = dict(self._task(task_description, urgency, task_shift, due_date), individual_id=individual["id"])
+        result = self._post("/assign", body)
+        sync_roster(self.individuals)
+        return result["predicted_completion"] if result["assigned"] else None
+
+    def record_match(self, task_description, category, urgency, matches, due_date, predicted_completion=None):
+        body = dict(self._task(task_description, urgency, "Any", due_date), task_category=category,
+                    matches=[[ind["id"], score] for ind, score in matches],
+                    predicted_completion=predicted_completion)
+        return self._post("/history", body)["recorded"]
@@ -0,0 +1,104 @@
+import csv
+import heapq
+import io
+import threading
+
+# Columns of the Performance Analytics table and export.
+ANALYTICS_COLUMNS = ["name", "skills", "shift", "available", "tasks_assigned", "tasks_completed", "avg_feedback",
+                     "predicted_completion"]
+CHART_SIZE = 25
+
+
+def analytics_row(individual):
+    row = {column: individual[column] for column in ANALYTICS_COLUMNS}
+    if row["predicted_completion"] is None:
+        row["predicted_completion"] = "N/A"
+    return row
+
+
+class PerformanceAggregates:
+    # Performance Analytics data kept up to date on the write path. update() is called
+    # with every changed individual and adjusts the running totals by the difference
+    # between their old and new row, so reading the summary never touches the whole
+    # roster. Chart data is computed at most once per version; the table is paged.
+    def __init__(self, individuals=()):
+        self._rows = {}
+        self._order = []
+        self._lock = threading.Lock()
+        self.version = 0
+        self._totals = {"individuals": 0, "available": 0, "tasks_assigned": 0, "tasks_completed": 0,
+                        "feedback_sum": 0.0}
+        self._by_shift = {}
+        self._chart = (-1, None)
+        for individual in individuals:
+            self.update(individual)
+
+    def _apply(self, row, sign):
+        totals = self._totals
+        totals["individuals"] += sign
+        totals["available"] += sign * bool(row["available"])
+        totals["tasks_assigned"] += sign * row["tasks_assigned"]
+        totals["tasks_completed"] += sign * row["tasks_completed"]
+        totals["feedback_sum"] += sign * row["avg_feedback"]
+        self._by_shift[row["shift"]] = self._by_shift.get(row["shift"], 0) + sign
+
+    def update(self, individual):
+        row = analytics_row(individual)
+        with self._lock:
+            old = self._rows.get(individual["id"])
+            if old == row:
+                return
+            if old is None:
+                self._order.append(individual["id"])
+            else:
+                self._apply(old, -1)
+            self._apply(row, 1)
+            self._rows[individual["id"]] = row
+            self.version += 1
+
+    def __len__(self):
+        return len(self._order)
+
+    def summary(self):
+        with self._lock:
+            totals = dict(self._totals)
+            by_shift = dict(self._by_shift)
+        count = totals.pop("individuals")
+        feedback_sum = totals.pop("feedback_sum")
+        totals["individuals"] = count
+        totals["avg_feedback"] = round(feedback_sum / count, 2) if count else None
+        totals["completion_rate"] = round(totals["tasks_completed"] / totals["tasks_assigned"], 3) \
+            if totals["tasks_assigned"] else None
+        totals["by_shift"] = {shift: n for shift, n in by_shift.items() if n}
+        return totals
+
+    def chart_data(self, size=CHART_SIZE):
+        # The people with the most tasks assigned, cached until the next change.
+        version, data = self._chart
+        if version == self.version and data is not None:
+            return data
+        with self._lock:
+            version = self.version
+            top = heapq.nlargest(size, self._rows.values(), key=lambda row: row["tasks_assigned"])
+        data = [{"name": row["name"], "tasks_assigned": row["tasks_assigned"]} for row in top]
+        self._chart = (version, data)
+        return data
+
+    def page(self, page, page_size):
+        with self._lock:
+            ids = self._order[page * page_size:(page + 1) * page_size]
+            return [dict(self._rows[i]) for i in ids]
+
+    def export_csv(self):
+        # Builds the full CSV export; call only when a download is requested.
+        with self._lock:
+            rows = [self._rows[i] for i in self._order]
+        return records_csv(rows, ANALYTICS_COLUMNS)
+
+
+def records_csv(records, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode("utf-8")
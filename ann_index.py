@@ -0,0 +1,219 @@
+import os
+import threading
+
+import numpy as np
+
+from allocation import is_free
+from embedding_store import skills_hash
+
+# Recall-vs-latency knob: how many of the nearest inverted lists each search scans.
+DEFAULT_NPROBE = int(os.environ.get("TASK_ALLOC_ANN_NPROBE", "8"))
+# Shifts with fewer free individuals than this are always scored exactly.
+EXACT_THRESHOLD = int(os.environ.get("TASK_ALLOC_ANN_THRESHOLD", "2000"))
+KMEANS_ITERATIONS = 8
+TRAIN_SAMPLE_PER_LIST = 64
+
+
+def unit_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def proficiency_bonus(individual):
+    # The candidate-only part of the score that does not change between tasks; it is
+    # added to the similarity during retrieval so strong candidates are not missed.
+    proficiencies = individual["proficiencies"]
+    return sum(proficiencies) / (len(proficiencies) * 10) if proficiencies else 0.0
+
+
+def index_key(individual):
+    return skills_hash(individual["skills"] or ""), tuple(individual["proficiencies"] or ())
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=KMEANS_ITERATIONS, seed=0):
+    # Lloyd's algorithm on unit vectors with cosine assignment.
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = unit_rows(sums)
+    return centroids
+
+
+class InvertedList:
+    # Ids, unit vectors and score biases of one cluster in growable arrays; removal
+    # swaps in the last row so every operation is O(1) apart from occasional regrowth.
+    def __init__(self, dim):
+        self.ids = []
+        self.vectors = np.empty((16, dim), dtype=np.float32)
+        self.bias = np.empty(16, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, individual_id, vector, bias):
+        if len(self.ids) == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+            self.bias = np.concatenate([self.bias, np.empty_like(self.bias)])
+        self.vectors[len(self.ids)] = vector
+        self.bias[len(self.ids)] = bias
+        self.ids.append(individual_id)
+        return len(self.ids) - 1
+
+    def remove(self, slot):
+        # Returns the id moved into slot, if any.
+        last = len(self.ids) - 1
+        moved = None
+        if slot != last:
+            moved = self.ids[last]
+            self.ids[slot] = moved
+            self.vectors[slot] = self.vectors[last]
+            self.bias[slot] = self.bias[last]
+        self.ids.pop()
+        return moved
+
+
+class ShiftPartition:
+    # IVF index over the free individuals of one shift. Members are tracked from the
+    # first change; the clusters are trained only once the partition is big enough
+    # to be searched approximately, and retrained when it has doubled since.
+    def __init__(self):
+        self.members = {}
+        self.pending = set()
+        self.where = {}
+        self.centroids = None
+        self.lists = []
+        self.trained_size = 0
+
+    def __len__(self):
+        return len(self.members)
+
+    def discard(self, individual_id):
+        self.members.pop(individual_id, None)
+        self.pending.discard(individual_id)
+        location = self.where.pop(individual_id, None)
+        if location is not None:
+            list_no, slot = location
+            moved = self.lists[list_no].remove(slot)
+            if moved is not None:
+                self.where[moved] = (list_no, slot)
+
+    def train(self, individuals, vectors):
+        n_lists = max(1, int(np.sqrt(len(vectors))))
+        sample = vectors
+        if len(vectors) > n_lists * TRAIN_SAMPLE_PER_LIST:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), n_lists * TRAIN_SAMPLE_PER_LIST, replace=False)]
+        self.centroids = spherical_kmeans(sample, n_lists)
+        self.lists = [InvertedList(vectors.shape[1]) for _ in range(n_lists)]
+        self.where = {}
+        self.pending = set()
+        self.insert(individuals, vectors)
+        self.trained_size = len(vectors)
+
+    def insert(self, individuals, vectors):
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for ind, vector, list_no in zip(individuals, vectors, assignment):
+            slot = self.lists[list_no].add(ind["id"], vector, proficiency_bonus(ind))
+            self.where[ind["id"]] = (int(list_no), slot)
+
+    def search(self, query, k, nprobe):
+        # Top-k member ids by cosine similarity plus proficiency bonus among the
+        # nprobe lists whose centroids are nearest to the query.
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        ids = []
+        blocks = []
+        biases = []
+        for list_no in probe:
+            inverted = self.lists[list_no]
+            if len(inverted):
+                ids.extend(inverted.ids)
+                blocks.append(inverted.vectors[:len(inverted)])
+                biases.append(inverted.bias[:len(inverted)])
+        if not ids:
+            return [], np.zeros(0, dtype=np.float32), np.zeros((0, len(query)), dtype=np.float32)
+        vectors = np.concatenate(blocks)
+        scores = vectors @ query + np.concatenate(biases)
+        top = np.argpartition(-scores, k - 1)[:k] if len(ids) > k else np.arange(len(ids))
+        return [ids[i] for i in top], scores[top], vectors[top]
+
+
+class CandidateIndex:
+    # First stage of two-stage matching: approximate nearest neighbours over the
+    # skill embeddings of free individuals, one partition per shift. sync() is
+    # called with every changed individual and keeps membership up to date in O(1);
+    # new or re-skilled members are encoded in one batch at the next search.
+    def __init__(self, embedding_store, model, nprobe=DEFAULT_NPROBE, exact_threshold=EXACT_THRESHOLD):
+        self.embedding_store = embedding_store
+        self.model = model
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self._partitions = {}
+        self._shift_of = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def sync(self, individual):
+        individual_id = individual["id"]
+        with self._lock:
+            shift = self._shift_of.get(individual_id)
+            keep = is_free(individual)
+            changed = self._keys.get(individual_id) != index_key(individual)
+            if shift is not None and (not keep or shift != individual["shift"] or changed):
+                self._partitions[shift].discard(individual_id)
+                del self._shift_of[individual_id]
+                shift = None
+            if keep and shift is None:
+                partition = self._partitions.setdefault(individual["shift"], ShiftPartition())
+                partition.members[individual_id] = individual
+                partition.pending.add(individual_id)
+                self._shift_of[individual_id] = individual["shift"]
+                self._keys[individual_id] = index_key(individual)
+
+    def size(self, shift="Any"):
+        if shift != "Any":
+            partition = self._partitions.get(shift)
+            return len(partition) if partition else 0
+        return sum(len(partition) for partition in self._partitions.values())
+
+    def use_for(self, shift):
+        # Whether a match in this shift should use approximate retrieval.
+        return self.size(shift) >= self.exact_threshold
+
+    def _ready(self, partition):
+        if not partition.pending and partition.centroids is not None:
+            return
+        if partition.centroids is None or len(partition) >= 2 * partition.trained_size:
+            individuals = list(partition.members.values())
+            partition.train(individuals, unit_rows(self.embedding_store.embeddings_for(individuals, self.model)))
+            return
+        individuals = [partition.members[i] for i in partition.pending]
+        partition.pending = set()
+        partition.insert(individuals, unit_rows(self.embedding_store.embeddings_for(individuals, self.model)))
+
+    def search(self, task_embedding, shift="Any", k=200, nprobe=None):
+        # Returns (individuals, skill embeddings) of up to k free candidates nearest to
+        # the task, merged across shifts when shift is "Any".
+        query = unit_rows(task_embedding)
+        nprobe = nprobe or self.nprobe
+        shifts = list(self._partitions) if shift == "Any" else [shift]
+        found = []
+        with self._lock:
+            for name in shifts:
+                partition = self._partitions.get(name)
+                if not partition:
+                    continue
+                self._ready(partition)
+                ids, sims, vectors = partition.search(query, k, nprobe)
+                found.extend((sim, partition.members[i], vector) for i, sim, vector in zip(ids, sims, vectors))
+        found.sort(key=lambda item: -item[0])
+        found = found[:k]
+        if not found:
+            return [], np.zeros((0, len(query)), dtype=np.float32)
+        return [item[1] for item in found], np.stack([item[2] for item in found])
@@ -0,0 +1,258 @@
+# Headless HTTP/JSON front end for the allocation engine.
+#
+#   python api.py --host 127.0.0.1 --port 8080
+#   python api.py --workers 8      # exact scoring sharded across 8 processes
+#
+#   POST /match     {"task_description": ..., "urgency": "High", "task_shift": "Any",
+#                    "due_date": "2025-04-03T17:00", "limit": 10}
+#   POST /allocate  same body plus optional "task_category" and "record" (default
+#                   true, adds the assignment to the match history); assigns the best
+#                   free individual
+#   POST /assign    same body plus "individual_id"; assigns that individual
+#   POST /history   same body plus "matches": [[individual_id, score], ...] and an
+#                   optional "predicted_completion"; records a match
+#   GET  /health
+#
+# The server owns the data directory. The Streamlit app becomes one of its clients
+# when started with ALLOCATION_API_URL pointing here (see allocation_client.py).
+# Concurrent /match requests are grouped by a MicroBatcher so their task
+# descriptions are encoded together and candidates are scored once per batch.
+import argparse
+import asyncio
+import datetime
+import json
+import threading
+
+from allocation import pending_task
+from ann_index import DEFAULT_NPROBE, EXACT_THRESHOLD
+from core_functions import get_storage
+from embedding_store import EmbeddingStore
+from engine import AllocationEngine, load_state, sync_roster
+from micro_batcher import MicroBatcher
+from resources import model, warm_up
+from storage import claim_data_dir
+
+MAX_BODY_BYTES = 1 << 20
+MAX_LIMIT = 1000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_task(body):
+    # Validates a request body into a pending task; every bad field is a 400 here so
+    # it never reaches a shared batch.
+    if not isinstance(body, dict):
+        raise ApiError(400, "Body must be a JSON object")
+    description = body.get("task_description")
+    if not isinstance(description, str) or not description.strip():
+        raise ApiError(400, "task_description is required")
+    urgency = body.get("urgency", "Medium")
+    if not isinstance(urgency, str) or urgency not in ("Low", "Medium", "High"):
+        raise ApiError(400, "urgency must be Low, Medium or High")
+    task_shift = body.get("task_shift", "Any")
+    if not isinstance(task_shift, str) or task_shift not in ("Any", "Morning", "Night"):
+        raise ApiError(400, "task_shift must be Any, Morning or Night")
+    limit = body.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_LIMIT):
+        raise ApiError(400, f"limit must be an integer between 1 and {MAX_LIMIT}")
+    due_date = body.get("due_date")
+    if due_date:
+        try:
+            due_date = datetime.datetime.fromisoformat(due_date)
+        except (TypeError, ValueError):
+            raise ApiError(400, "due_date must be an ISO 8601 datetime")
+        if due_date.tzinfo is not None:
+            # Due dates are compared with the server's naive local time.
+            due_date = due_date.astimezone().replace(tzinfo=None)
+    category = body.get("task_category")
+    if category is not None and not isinstance(category, str):
+        raise ApiError(400, "task_category must be a string")
+    task = pending_task(description, urgency, task_shift, due_date or None)
+    task["limit"] = limit
+    task["category"] = category.strip() if category else None
+    return task
+
+
+def parse_flag(body, name, default):
+    value = body.get(name, default)
+    if not isinstance(value, bool):
+        raise ApiError(400, f"{name} must be true or false")
+    return value
+
+
+def individual_json(individual, score):
+    return {"id": individual["id"], "name": individual["name"], "skills": individual["skills"],
+            "shift": individual["shift"], "score": round(score, 4)}
+
+
+class AllocationService:
+    def __init__(self, engine, max_batch_size=64, max_latency=0.005):
+        self.engine = engine
+        self.matcher = MicroBatcher(self.match_many, max_batch_size=max_batch_size, max_latency=max_latency)
+        # Assignments mutate the roster, so they run one at a time.
+        self._assign_lock = threading.Lock()
+
+    def match_many(self, tasks):
+        # Roster changes other processes made (e.g. the app) are picked up per batch.
+        sync_roster(self.engine.individuals, self.engine.feedback)
+        return self.engine.match_many(tasks)
+
+    async def match(self, body):
+        ranked = await asyncio.wrap_future(self.matcher.submit(parse_task(body)))
+        return {"matches": [individual_json(ind, score) for ind, score in ranked]}
+
+    def _allocate(self, task, record):
+        with self._assign_lock:
+            sync_roster(self.engine.individuals, self.engine.feedback)
+            candidate, score, explanation, predicted_time = self.engine.allocate(
+                task["task_description"], task["urgency"], task["task_shift"], task["due_date"])
+            if candidate is not None and record:
+                self.engine.record_match(task["task_description"], task["category"], task["urgency"],
+                                         [(candidate, score)], task["due_date"], predicted_time)
+            get_storage().flush()
+        if candidate is None:
+            return {"assigned": None, "explanation": explanation}
+        return {"assigned": individual_json(candidate, score), "predicted_completion": predicted_time,
+                "explanation": explanation}
+
+    async def allocate(self, body):
+        task = parse_task(body)
+        record = parse_flag(body, "record", True)
+        return await asyncio.get_running_loop().run_in_executor(None, self._allocate, task, record)
+
+    def _assign(self, individual_id, task):
+        with self._assign_lock:
+            sync_roster(self.engine.individuals, self.engine.feedback)
+            individual = self.engine.individuals.get(individual_id)
+            if individual is None:
+                raise ApiError(404, f"Unknown individual {individual_id}")
+            predicted_time = self.engine.assign(individual, task["task_description"], task["due_date"],
+                                                task["urgency"], task["task_shift"])
+            get_storage().flush()
+        return {"assigned": predicted_time is not None, "predicted_completion": predicted_time}
+
+    async def assign(self, body):
+        task = parse_task(body)
+        individual_id = body.get("individual_id")
+        if not isinstance(individual_id, str):
+            raise ApiError(400, "individual_id is required")
+        return await asyncio.get_running_loop().run_in_executor(None, self._assign, individual_id, task)
+
+    def _record(self, task, matches, predicted_time):
+        sync_roster(self.engine.individuals, self.engine.feedback)
+        ranked = []
+        for individual_id, score in matches:
+            individual = self.engine.individuals.get(individual_id)
+            if individual is None:
+                raise ApiError(404, f"Unknown individual {individual_id}")
+            ranked.append((individual, score))
+        record = self.engine.record_match(task["task_description"], task["category"], task["urgency"], ranked,
+                                          task["due_date"], predicted_time)
+        return {"recorded": record}
+
+    async def history(self, body):
+        task = parse_task(body)
+        matches = body.get("matches")
+        if not isinstance(matches, list) or not all(
+                isinstance(match, list) and len(match) == 2 and isinstance(match[0], str)
+                and isinstance(match[1], (int, float)) and not isinstance(match[1], bool) for match in matches):
+            raise ApiError(400, "matches must be a list of [individual_id, score] pairs")
+        predicted_time = body.get("predicted_completion")
+        if predicted_time is not None and (isinstance(predicted_time, bool)
+                                           or not isinstance(predicted_time, (int, float))):
+            raise ApiError(400, "predicted_completion must be a number")
+        return await asyncio.get_running_loop().run_in_executor(None, self._record, task, matches, predicted_time)
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok", "batches": self.matcher.stats()}
+        routes = {"/match": self.match, "/allocate": self.allocate, "/assign": self.assign, "/history": self.history}
+        if path not in routes:
+            raise ApiError(404, f"Unknown path {path}")
+        if method != "POST":
+            raise ApiError(405, "Use POST")
+        return await routes[path](body)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                status, payload = 200, None
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_BYTES:
+                        raise ApiError(413, "Request body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise ApiError(400, "Body must be JSON")
+                    payload = await self.route(method, path.split("?", 1)[0], body)
+                except ApiError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": str(exc)}
+                data = json.dumps(payload, default=str).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-latency-ms", type=float, default=5.0)
+    parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="ANN lists scanned per match")
+    parser.add_argument("--exact-threshold", type=int, default=EXACT_THRESHOLD,
+                        help="free individuals in a shift below which matching is exact")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="score exactly across this many worker processes instead of using the ANN index")
+    args = parser.parse_args()
+
+    claim_data_dir("data")
+    warm_up()
+    engine = AllocationEngine(load_state(get_storage()), model, EmbeddingStore("data"), nprobe=args.nprobe,
+                              exact_threshold=args.exact_threshold, retrieval="sharded" if args.workers else "auto",
+                              workers=args.workers or 1)
+    service = AllocationService(engine, args.max_batch_size, args.max_latency_ms / 1000)
+    print(f"Allocation API listening on http://{args.host}:{args.port}")
+    asyncio.run(service.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Compares exact matching with two-stage (ANN shortlist + full rerank) matching on
+# synthetic rosters: per-match latency and recall of the exact top matches for a
+# range of nprobe values.
+#
+#   python benchmarks/bench_ann.py --sizes 10000 100000 --nprobe 1 4 8 16 32
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generators import BagOfWordsEncoder, make_individuals, make_tasks
+from embedding_store import EmbeddingStore
+from engine import AllocationEngine, load_state
+from storage import MemoryBackend
+
+
+def timed_matches(engine, tasks, limit):
+    times = []
+    results = []
+    for task in tasks:
+        start = time.perf_counter()
+        results.append(engine.match(task, "High", "Any", limit=limit))
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), results
+
+
+def recall(expected, found):
+    # Share of the exact top matches recovered. Scores tied with the exact cut-off
+    # count as hits, since many synthetic people share skills and proficiencies.
+    if not expected:
+        return 1.0
+    cutoff = expected[-1][1] - 1e-6
+    return min(sum(score >= cutoff for _, score in found), len(expected)) / len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--candidates", type=int, default=256, help="shortlist size reranked with the full score")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    encoder = BagOfWordsEncoder()
+    tasks = make_tasks(args.tasks, args.seed + 1)
+    print(f"{'size':>8} {'mode':>10} {'median ms':>10} {'recall@' + str(args.limit):>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage = MemoryBackend()
+            for record in make_individuals(size, args.seed):
+                storage.put("individuals", record["id"], record)
+            state = load_state(storage, data_dir=data_dir)
+            store = EmbeddingStore(data_dir)
+            store.update(list(state["individuals"]), encoder)
+            exact = AllocationEngine(state, encoder, store, retrieval="exact")
+            exact.match(tasks[0])
+            exact_time, expected = timed_matches(exact, tasks, args.limit)
+            print(f"{size:>8} {'exact':>10} {exact_time * 1000:>10.2f} {1.0:>10.3f}")
+            for nprobe in args.nprobe:
+                engine = AllocationEngine(state, encoder, store, nprobe=nprobe, exact_threshold=0,
+                                          ann_candidates=args.candidates)
+                start = time.perf_counter()
+                engine.match(tasks[0])
+                build = time.perf_counter() - start
+                ann_time, found = timed_matches(engine, tasks, args.limit)
+                hits = statistics.fmean(recall(a, b) for a, b in zip(expected, found))
+                print(f"{size:>8} {f'nprobe={nprobe}':>10} {ann_time * 1000:>10.2f} {hits:>10.3f}"
+                      f"   (index build {build:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Races many threads to assign and release tasks on a shared roster through the
+# compare-and-swap assign_task/release_task API and reports throughput, conflict
+# rate and any double-booking (a task overwritten while its assignee was busy).
+#
+#   python benchmarks/bench_assign_contention.py --people 1000 --hot 16 --threads 1,4,16,64
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions import assign_task, release_task
+from roster import Roster
+
+
+def make_roster(count):
+    return Roster({"id": f"{i:08x}", "name": f"Person {i}", "skills": "python", "proficiencies": [3.0],
+                   "shift": "Morning", "avg_feedback": 3.0, "predicted_completion": None, "current_task": None}
+                  for i in range(count))
+
+
+def worker(roster, hot, operations, seed, totals, lock):
+    rng = random.Random(seed)
+    claimed = conflicts = double_booked = 0
+    for op in range(operations):
+        individual = roster[rng.randrange(hot)]
+        version = individual["version"]
+        task = f"task-{seed}-{op}"
+        if assign_task(individual, task, expected_version=version) is None:
+            conflicts += 1
+            continue
+        claimed += 1
+        if individual["current_task"] != task:
+            double_booked += 1
+        if not release_task(individual, task=task):
+            double_booked += 1
+    with lock:
+        totals["claimed"] += claimed
+        totals["conflicts"] += conflicts
+        totals["double_booked"] += double_booked
+
+
+def run(people, hot, threads, operations):
+    roster = make_roster(people)
+    totals = {"claimed": 0, "conflicts": 0, "double_booked": 0}
+    lock = threading.Lock()
+    pool = [threading.Thread(target=worker, args=(roster, hot, operations, seed, totals, lock))
+            for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assigned = sum(ind["tasks_assigned"] for ind in roster)
+    still_busy = len(roster.active())
+    return totals, elapsed, assigned, still_busy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=1000)
+    parser.add_argument("--hot", type=int, default=16, help="threads only pick from the first N people")
+    parser.add_argument("--threads", default="1,4,16,64")
+    parser.add_argument("--operations", type=int, default=5000, help="assign attempts per thread")
+    args = parser.parse_args()
+
+    hot = min(args.hot, args.people)
+    print(f"{args.people} people, {hot} contended, {args.operations} attempts per thread")
+    print(f"{'threads':>8} {'attempts/s':>12} {'claims/s':>10} {'conflicts':>10} {'double-booked':>14}")
+    failed = False
+    for threads in (int(t) for t in args.threads.split(",")):
+        totals, elapsed, assigned, still_busy = run(args.people, hot, threads, args.operations)
+        attempts = threads * args.operations
+        print(f"{threads:>8} {attempts / elapsed:>12,.0f} {totals['claimed'] / elapsed:>10,.0f} "
+              f"{totals['conflicts'] / attempts:>10.1%} {totals['double_booked']:>14}")
+        if totals["double_booked"] or assigned != totals["claimed"] or still_busy:
+            failed = True
+            print(f"  inconsistent: {assigned} recorded assignments for {totals['claimed']} claims, "
+                  f"{still_busy} people left busy")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
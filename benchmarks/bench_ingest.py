@@ -0,0 +1,108 @@
+# Bulk-imports a synthetic HR export (with some invalid and duplicate rows) in each
+# supported format into a fresh SQLite store and reports rows/sec. Also times the
+# one-at-a-time form path (add_individual + embedding update) on a sample.
+#
+#   python benchmarks/bench_ingest.py --rows 50000
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generators import HashingEncoder, make_individuals
+from core_functions import add_individual
+from embedding_store import EmbeddingStore
+from engine import load_state
+from ingest import RosterImporter
+from storage import SQLiteBackend
+
+COLUMNS = ["external_id", "name", "skills", "proficiencies", "shift", "available"]
+
+
+def export_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for i, ind in enumerate(make_individuals(count, seed)):
+        row = {
+            "external_id": f"E{i:07d}",
+            "name": ind["name"],
+            "skills": ind["skills"],
+            "proficiencies": ", ".join(str(p) for p in ind["proficiencies"]),
+            "shift": ind["shift"],
+            "available": "yes" if ind["available"] else "no",
+        }
+        roll = rng.random()
+        if roll < 0.01:
+            row["proficiencies"] += ", 4"
+        elif roll < 0.02:
+            row["proficiencies"] = "9"
+        elif roll < 0.04 and rows:
+            row["external_id"] = rows[rng.randrange(len(rows))]["external_id"]
+        rows.append(row)
+    return rows
+
+
+def write_file(rows, directory, fmt):
+    path = os.path.join(directory, f"roster.{fmt}")
+    if fmt == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist(rows), path)
+    return path
+
+
+def fresh_state(directory):
+    storage = SQLiteBackend(os.path.join(directory, "app.db"))
+    state = load_state(storage, data_dir=directory)
+    return storage, state, EmbeddingStore(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "jsonl", "parquet"])
+    parser.add_argument("--form-sample", type=int, default=500, help="rows added one at a time for comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    encoder = HashingEncoder()
+    rows = export_rows(args.rows, args.seed)
+    print(f"{'path':>10} {'rows':>8} {'added':>8} {'dupes':>7} {'rejected':>9} {'seconds':>8} {'rows/sec':>9}")
+    for fmt in args.formats:
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_file(rows, directory, fmt)
+            storage, state, store = fresh_state(directory)
+            importer = RosterImporter(state["individuals"], storage, state["feedback"], store, encoder)
+            report = importer.run(path, fmt, args.chunk_size)
+            print(f"{fmt:>10} {report['rows']:>8} {report['added']:>8} {report['duplicates']:>7} "
+                  f"{report['rejected']:>9} {report['seconds']:>8.2f} {report['rows_per_sec']:>9,}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage, state, store = fresh_state(directory)
+        sample = rows[:args.form_sample]
+        start = time.perf_counter()
+        for row in sample:
+            add_individual(state["individuals"], row["name"], row["skills"], row["proficiencies"], True, row["shift"])
+            store.update([state["individuals"][-1]], encoder)
+        storage.flush()
+        elapsed = time.perf_counter() - start
+        print(f"{'form':>10} {len(sample):>8} {len(sample):>8} {'-':>7} {'-':>9} {elapsed:>8.2f} "
+              f"{round(len(sample) / elapsed):>9,}")
+
+
+if __name__ == "__main__":
+    main()
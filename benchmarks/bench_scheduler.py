@@ -0,0 +1,73 @@
+# Drives JobScheduler with a simulated clock: queues N jobs spread over a month,
+# replays the month and checks that no job is dispatched early or out of time order.
+#
+#   python benchmarks/bench_scheduler.py --jobs 100000
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import JobScheduler, SimulatedClock
+
+
+def make_jobs(count, start, rng):
+    jobs = []
+    for i in range(count):
+        scheduled = start + datetime.timedelta(minutes=rng.randrange(30 * 24 * 60))
+        jobs.append({
+            "job_id": f"{i:08x}",
+            "task_description": f"Job {i}",
+            "urgency": rng.choice(["Low", "Medium", "High"]),
+            "task_shift": rng.choice(["Any", "Morning", "Night"]),
+            "required_quals": [],
+            "scheduled_time": scheduled,
+            "due_date": scheduled + datetime.timedelta(hours=rng.randrange(1, 72)) if rng.random() < 0.8 else None,
+            "assigned": False,
+        })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--capacity", type=float, default=0.9, help="share of dispatched jobs that get placed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    clock = SimulatedClock()
+    jobs = make_jobs(args.jobs, clock.now(), rng)
+    order = []
+
+    def dispatch(batch):
+        order.extend((clock.now(), job) for job in batch)
+        unplaced = [job for job in batch if rng.random() > args.capacity]
+        unplaced_ids = {job["job_id"] for job in unplaced}
+        for job in batch:
+            job["assigned"] = job["job_id"] not in unplaced_ids
+        return unplaced
+
+    scheduler = JobScheduler(dispatch, clock=clock, retry_interval=600)
+    start = time.perf_counter()
+    for job in jobs:
+        scheduler.add(job)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scheduler.run_until(clock.now() + datetime.timedelta(days=60))
+    run_time = time.perf_counter() - start
+
+    assert all(job["assigned"] for job in jobs), "some jobs were never placed"
+    assert len(scheduler) == 0
+    assert all(at >= job["scheduled_time"] for at, job in order), "job dispatched before its scheduled time"
+    assert all(a[0] <= b[0] for a, b in zip(order, order[1:])), "dispatch times went backwards"
+    print(f"jobs={args.jobs} add={add_time:.3f}s ({args.jobs / add_time:,.0f}/s) "
+          f"replay={run_time:.3f}s ({len(order) / run_time:,.0f} dispatches/s) retried={scheduler.retried}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Compares the vectorized scorer in scoring.py with the original per-candidate loop
+# from the Task Matching tab, checking that both produce the same scores. The
+# end-to-end speedup includes building the candidate matrix; the cached speedup is
+# what a match gets when AllocationEngine reuses the matrix because neither the
+# roster nor the feedback changed since the last match.
+#
+#   python benchmarks/bench_scoring.py --sizes 1000 10000 100000
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_functions import auto_extract_skills, calculate_task_complexity, cosine_similarity, due_date_multiplier
+from scoring import CandidateMatrix, task_features, top_k
+
+SKILLS = ["python", "machine learning", "flask", "javascript", "react", "nodejs", "java",
+          "spring boot", "c++", "embedded systems", "sql", "docker", "kubernetes", "go", "rust"]
+DIM = 384
+
+
+def make_roster(size, rng):
+    roster = []
+    for i in range(size):
+        n_skills = int(rng.integers(1, 5))
+        skills = list(rng.choice(SKILLS, n_skills, replace=False))
+        roster.append({
+            "id": f"{i:08x}",
+            "skills": ", ".join(skills),
+            "proficiencies": [float(x) for x in rng.uniform(1, 5, n_skills).round(1)],
+        })
+    feedback = {ind["id"]: float(rng.normal(0, 0.1)) for ind in roster}
+    return roster, feedback, rng.normal(size=(size, DIM)).astype(np.float32)
+
+
+def loop_scores(task_description, task_urgency, due_date, task_embedding, roster, skill_embeddings, feedback):
+    sim_scores = [cosine_similarity(task_embedding, emb) for emb in skill_embeddings]
+    urgency_weight = {"Low": 0.9, "Medium": 1.0, "High": 1.1}[task_urgency]
+    adjusted_scores = []
+    for ind, score in zip(roster, sim_scores):
+        adjustment = feedback.get(ind["id"], 0.0)
+        proficiency_bonus = sum(ind["proficiencies"]) / (len(ind["proficiencies"]) * 10) if ind["proficiencies"] else 0
+        match_bonus = 0.1 * len([skill for skill in auto_extract_skills(task_description) if skill.lower() in ind["skills"].lower()])
+        dd_mult = due_date_multiplier(due_date)
+        final_score = (score + adjustment + proficiency_bonus + match_bonus) * urgency_weight * dd_mult * (1 + calculate_task_complexity(task_description))
+        adjusted_scores.append(final_score)
+    return np.array(adjusted_scores)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    task_description = "Build a machine learning pipeline in python and expose it over a flask API"
+    due_date = datetime.datetime.now() + datetime.timedelta(hours=30)
+    task_embedding = rng.normal(size=DIM).astype(np.float32)
+    print(f"{'size':>8} {'loop (s)':>10} {'build (s)':>10} {'score (s)':>10} {'end-to-end':>11} {'cached':>8}"
+          f"  max |diff|")
+    for size in args.sizes:
+        roster, feedback, skill_embeddings = make_roster(size, rng)
+
+        start = time.perf_counter()
+        expected = loop_scores(task_description, "High", due_date, task_embedding, roster, skill_embeddings, feedback)
+        expected_rank = sorted(range(size), key=lambda i: expected[i], reverse=True)[:args.top]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        candidates = CandidateMatrix(roster, skill_embeddings, feedback)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        features = task_features(task_description, "High", due_date, task_embedding)
+        scores = candidates.score(features)
+        rank = top_k(scores, args.top)
+        score_time = time.perf_counter() - start
+
+        diff = float(np.max(np.abs(scores - expected)))
+        assert diff < 1e-4, f"scores diverge from the reference loop by {diff}"
+        assert np.allclose(expected[expected_rank], scores[rank], atol=1e-4), "top-k ranking differs"
+        print(f"{size:>8} {loop_time:>10.3f} {build_time:>10.3f} {score_time:>10.4f} "
+              f"{loop_time / (build_time + score_time):>10.1f}x {loop_time / score_time:>7.1f}x  {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Compares single-process exact matching with sharded matching across worker
+# processes: throughput of task-to-person scores per second for batches of tasks
+# and whether the rankings agree. Speedup is measured against "inline", one
+# score_many call over prebuilt columns in this process, so it counts only what the
+# extra processes add. BLAS is pinned to one thread per process so the speedup
+# comes from the worker processes alone.
+#
+#   python benchmarks/bench_sharded.py --sizes 100000 1000000 --workers 1 2 4 8
+import os
+
+for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(variable, "1")
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generators import HashingEncoder, make_individuals, make_tasks
+from embedding_store import EmbeddingStore
+from engine import AllocationEngine, load_state
+from feature_cache import task_feature_cache
+from scoring import CandidateMatrix, task_features, top_k
+from storage import MemoryBackend
+
+
+def timed_batches(engine, batches, rounds):
+    engine.match_many(batches[0])
+    times = []
+    results = None
+    for round_no in range(rounds):
+        start = time.perf_counter()
+        results = engine.match_many(batches[round_no % len(batches)])
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), results
+
+
+def timed_inline(matrix, encoder, batches, rounds, limit):
+    # Single-process scoring of every free individual with the columns already built.
+    feature_batches = []
+    for batch in batches:
+        embeddings = task_feature_cache.embeddings([task["task_description"] for task in batch], encoder)
+        feature_batches.append([task_features(task["task_description"], task["urgency"], None, embedding)
+                                for task, embedding in zip(batch, embeddings)])
+    times = []
+    for round_no in range(rounds + 1):
+        start = time.perf_counter()
+        scores = matrix.score_many(feature_batches[round_no % len(feature_batches)])
+        [top_k(row, limit) for row in scores]
+        times.append(time.perf_counter() - start)
+    return statistics.median(times[1:])
+
+
+def same_ranking(expected, found):
+    # Compares scores rather than ids, since synthetic people often tie.
+    return all(len(a) == len(b) and all(abs(x[1] - y[1]) < 1e-4 for x, y in zip(a, b))
+               for a, b in zip(expected, found))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch", type=int, default=64, help="tasks per match_many call")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    encoder = HashingEncoder()
+    tasks = make_tasks(args.batch * 4, args.seed)
+    batches = [[{"task_description": task, "urgency": "High", "task_shift": "Any", "limit": args.limit}
+                for task in tasks[i:i + args.batch]] for i in range(0, len(tasks), args.batch)]
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'size':>8} {'mode':>10} {'median ms':>10} {'scores/sec':>12} {'speedup':>8} {'same':>5}")
+    for size in args.sizes:
+        storage = MemoryBackend()
+        for record in make_individuals(size, args.seed):
+            storage.put("individuals", record["id"], record)
+        with tempfile.TemporaryDirectory() as data_dir:
+            state = load_state(storage, data_dir=data_dir)
+            store = EmbeddingStore(data_dir)
+            store.update(list(state["individuals"]), encoder)
+            exact = AllocationEngine(state, encoder, store, retrieval="exact")
+            slowest, expected = timed_batches(exact, batches, args.rounds)
+            free = state["individuals"].free()
+            pairs = args.batch * len(free)
+            matrix = CandidateMatrix(free, store.embeddings_for(free, encoder), state["feedback"])
+            base = timed_inline(matrix, encoder, batches, args.rounds, args.limit)
+            print(f"{size:>8} {'exact':>10} {slowest * 1000:>10.1f} {pairs / slowest:>12.3g} "
+                  f"{base / slowest:>8.2f} {'yes':>5}")
+            print(f"{size:>8} {'inline':>10} {base * 1000:>10.1f} {pairs / base:>12.3g} {1.0:>8.2f} {'-':>5}")
+            for workers in args.workers:
+                engine = AllocationEngine(state, encoder, store, retrieval="sharded", workers=workers)
+                median, found = timed_batches(engine, batches, args.rounds)
+                print(f"{size:>8} {f'{workers} proc':>10} {median * 1000:>10.1f} {pairs / median:>12.3g} "
+                      f"{base / median:>8.2f} {'yes' if same_ranking(expected, found) else 'no':>5}")
+                engine.sharded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Seeded generators for synthetic rosters, tasks, job schedules and match history.
+# The same seed and size always give the same data, so runs are comparable.
+import datetime
+import hashlib
+import json
+import os
+import random
+
+import numpy as np
+
+SKILLS = ["python", "machine learning", "flask", "javascript", "react", "nodejs", "java",
+          "spring boot", "c++", "embedded systems", "sql", "docker", "kubernetes", "go", "rust",
+          "data analysis", "aws", "terraform", "django", "typescript"]
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank", "Grace", "Heidi", "Ivan", "Judy",
+               "Mallory", "Niaj", "Olivia", "Peggy", "Rupert", "Sybil", "Trent", "Victor", "Walter", "Yara"]
+LAST_NAMES = ["Smith", "Jones", "Garcia", "Chen", "Patel", "Kim", "Novak", "Silva", "Okafor", "Larsen"]
+VERBS = ["Build", "Fix", "Refactor", "Deploy", "Review", "Optimize", "Document", "Test", "Migrate", "Design"]
+OBJECTS = ["an API", "the data pipeline", "a dashboard", "the login flow", "a recommendation model",
+           "the billing service", "a CI workflow", "the mobile app", "a reporting job", "the search index"]
+SHIFTS = ["Morning", "Night"]
+URGENCIES = ["Low", "Medium", "High"]
+
+
+def make_individuals(count, seed=0):
+    # Records with the same fields as add_individual, plus some history.
+    rng = random.Random(seed)
+    individuals = []
+    for i in range(count):
+        skills = rng.sample(SKILLS, rng.randint(1, 4))
+        individuals.append({
+            "id": f"{i:08x}",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "skills": ", ".join(skills),
+            "proficiencies": [round(rng.uniform(1, 5), 1) for _ in skills],
+            "available": rng.random() < 0.9,
+            "shift": rng.choice(SHIFTS),
+            "tasks_assigned": 0,
+            "tasks_completed": rng.randint(0, 20),
+            "avg_feedback": round(rng.uniform(1, 5), 2),
+            "predicted_completion": None,
+            "current_task": None,
+            "progress": 0,
+        })
+    return individuals
+
+
+def make_task(rng):
+    skills = rng.sample(SKILLS, rng.randint(1, 3))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {' and '.join(skills)}"
+
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    return [make_task(rng) for _ in range(count)]
+
+
+def make_jobs(count, seed=0, start=None):
+    # Job records in the shape built by the Job Scheduling tab.
+    rng = random.Random(seed)
+    start = start or datetime.datetime(2025, 1, 1, 9, 0)
+    jobs = []
+    for i in range(count):
+        scheduled = start + datetime.timedelta(minutes=rng.randrange(7 * 24 * 60))
+        jobs.append({
+            "job_id": f"job-{i:08x}",
+            "task_description": make_task(rng),
+            "urgency": rng.choice(URGENCIES),
+            "task_shift": rng.choice(["Any"] + SHIFTS),
+            "required_quals": [],
+            "scheduled_time": scheduled,
+            "due_date": scheduled + datetime.timedelta(hours=rng.randrange(1, 72)) if rng.random() < 0.8 else None,
+            "assigned": False,
+        })
+    return jobs
+
+
+def write_match_history(directory, count, individual_ids, seed=0):
+    # Writes count match records straight into one HistoryLog segment, skipping the
+    # per-record fsync of HistoryLog.append.
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "2025-01-01.jsonl"), "w", encoding="utf-8") as f:
+        for i in range(count):
+            record = {
+                "task": make_task(rng),
+                "category": "General",
+                "urgency": rng.choice(URGENCIES),
+                "matches": [(rng.choice(individual_ids), round(rng.random(), 4)) for _ in range(3)],
+                "due_date": "N/A",
+                "timestamp": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+class HashingEncoder:
+    # Deterministic stand-in for the sentence encoder: each text maps to a fixed
+    # random unit vector. Lets the suite time the engine without the model's cost.
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, sentences, **kwargs):
+        vectors = np.empty((len(sentences), self.dim), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            seed = int.from_bytes(hashlib.sha1(sentence.encode("utf-8")).digest()[:8], "little")
+            vectors[row] = np.random.default_rng(seed).standard_normal(self.dim)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class BagOfWordsEncoder(HashingEncoder):
+    # Sums a fixed random vector per word, so texts sharing skills get similar
+    # embeddings. Closer to a sentence encoder than HashingEncoder for measuring
+    # retrieval recall.
+    def encode(self, sentences, **kwargs):
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        words = {}
+        for row, sentence in enumerate(sentences):
+            for word in sentence.lower().replace(",", " ").split():
+                if word not in words:
+                    words[word] = super().encode([word])[0]
+                vectors[row] += words[word]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
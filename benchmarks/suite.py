@@ -0,0 +1,199 @@
+# Times each engine path (manual match, batched match, batched match sharded across
+# worker processes, auto allocation, batch job allocation, roster search, analytics
+# table, history paging) on synthetic rosters
+# and records the peak memory of one call. Results are compared against a stored
+# baseline and cases slower or larger than the tolerance are flagged. Slowdowns
+# under --min-delta are ignored, since sub-millisecond cases move by more than the
+# tolerance from run to run.
+#
+#   python -m benchmarks.suite --sizes 1000 10000 100000
+#   python -m benchmarks.suite --sizes 1000 10000 --save-baseline
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generators import HashingEncoder, make_individuals, make_jobs, make_tasks, write_match_history
+from core_functions import allocate_jobs, release_task
+from embedding_store import EmbeddingStore
+from engine import AllocationEngine, load_state
+from storage import MemoryBackend
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+JOB_BATCH = 100
+MATCH_BATCH = 64
+MIN_DELTA = 0.001
+
+
+def measure(fn, min_rounds=5, max_rounds=200, max_time=1.0):
+    # One warm-up call and one call traced for peak memory, then repeated rounds until
+    # max_time or max_rounds is reached. The traced call comes first so it always
+    # gets the same input however many rounds the timing loop runs.
+    fn()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_rounds or (len(times) < max_rounds and time.perf_counter() - started < max_time):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "rounds": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def analytics_table(analytics):
+    # What the Performance Analytics tab reads on every rerun.
+    return analytics.summary(), analytics.page(0, 50), analytics.chart_data()
+
+
+def build_cases(size, seed, data_dir, encoder):
+    storage = MemoryBackend()
+    for record in make_individuals(size, seed):
+        storage.put("individuals", record["id"], record)
+    state = load_state(storage, data_dir=data_dir)
+    individuals = state["individuals"]
+    write_match_history(os.path.join(data_dir, "match_history"), size, [ind["id"] for ind in individuals], seed)
+    store = EmbeddingStore(data_dir)
+    engine = AllocationEngine(state, encoder, store)
+    sharded = AllocationEngine(state, encoder, store, retrieval="sharded")
+    # Each case walks its own copy of the task list, so its inputs do not depend on how
+    # many rounds the cases before it ran.
+    task_list = make_tasks(256, seed)
+    tasks = {name: itertools.cycle(task_list) for name in ("match", "match_batch", "match_batch_sharded", "allocate")}
+    terms = itertools.cycle(["py", "java", "machine", "alice", "k", "rust", "data"])
+    jobs = make_jobs(JOB_BATCH, seed)
+    pages = itertools.cycle([0, 1, 10, max(size // 20 - 1, 0)])
+
+    def allocate():
+        candidate, _, _, _ = engine.allocate(next(tasks["allocate"]), "High", "Any")
+        if candidate is not None:
+            release_task(candidate)
+
+    def allocate_job_batch():
+        for job in jobs:
+            job["assigned"] = False
+        allocate_jobs(jobs, individuals.free(), encoder, state["feedback"], store)
+        for job in jobs:
+            if job["assigned"]:
+                release_task(individuals.get(job["assigned_to"]))
+
+    def match_batch(matcher, name):
+        return matcher.match_many([{"task_description": next(tasks[name]), "urgency": "Medium", "task_shift": "Any"}
+                                  for _ in range(MATCH_BATCH)])
+
+    return {
+        "match": lambda: engine.match(next(tasks["match"]), "High", "Any"),
+        "match_batch": lambda: match_batch(engine, "match_batch"),
+        "match_batch_sharded": lambda: match_batch(sharded, "match_batch_sharded"),
+        "allocate": allocate,
+        "allocate_jobs": allocate_job_batch,
+        "search": lambda: individuals.search(next(terms)),
+        "analytics": lambda: analytics_table(state["analytics"]),
+        "analytics_export": lambda: state["analytics"].export_csv(),
+        "history_page": lambda: state["match_history"].page(next(pages), 20),
+    }
+
+
+def compare(results, baseline, tolerance, memory_tolerance, min_delta=MIN_DELTA):
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["median"] - base["median"] > max(base["median"] * tolerance, min_delta):
+            regressions.append(f"{key}: median {result['median'] * 1000:.2f} ms vs {base['median'] * 1000:.2f} ms")
+        if result["peak_kb"] > base["peak_kb"] * (1 + memory_tolerance):
+            regressions.append(f"{key}: peak {result['peak_kb']:.0f} KiB vs {base['peak_kb']:.0f} KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--cases", nargs="+", help="only run these cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--encoder", choices=["hashing", "model"], default="hashing",
+                        help="hashing skips the sentence model so only engine time is measured")
+    parser.add_argument("--max-time", type=float, default=1.0, help="seconds of timed rounds per case")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA,
+                        help="median slowdowns below this many seconds are not flagged")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory growth")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.encoder == "model":
+        from resources import model as encoder
+    else:
+        encoder = HashingEncoder()
+
+    results = {}
+    print(f"{'case':>28} {'rounds':>7} {'median ms':>10} {'min ms':>10} {'stddev ms':>10} {'peak KiB':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            start = time.perf_counter()
+            cases = build_cases(size, args.seed, data_dir, encoder)
+            print(f"-- {size} individuals (setup {time.perf_counter() - start:.1f} s)")
+            for name, fn in cases.items():
+                if args.cases and name not in args.cases:
+                    continue
+                result = measure(fn, max_time=args.max_time)
+                results[f"{size}/{name}"] = result
+                print(f"{f'{size}/{name}':>28} {result['rounds']:>7} {result['median'] * 1000:>10.2f} "
+                      f"{result['min'] * 1000:>10.2f} {result['stddev'] * 1000:>10.2f} {result['peak_kb']:>10.0f}")
+
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(), "encoder": args.encoder,
+                 "seed": args.seed},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        baseline = {"meta": report["meta"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline["results"] = json.load(f)["results"]
+        baseline["results"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline first.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("encoder") != args.encoder:
+        print(f"Baseline was recorded with the {baseline['meta'].get('encoder')} encoder; skipping comparison.")
+        return
+    regressions = compare(results, baseline["results"], args.tolerance, args.memory_tolerance, args.min_delta)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,36 @@
 import datetime
 import uuid
 
+import numpy as np
+import streamlit as st
+
+from progress_tracker import ProgressTracker
+from roster import record_lock
+from storage import open_backend
+from tracing import traced
+
+_storage = None
+_progress_tracker = None
+
+def get_storage():
+    # Process-wide storage backend shared by every session (SQLite by default).
+    global _storage
+    if _storage is None:
+        _storage = open_backend()
+    return _storage
+
+def set_storage(backend):
+    global _storage
+    _storage = backend
+
+def get_progress_tracker():
+    # Process-wide tracker of active assignments, shared with background workers.
+    global _progress_tracker
+    if _progress_tracker is None:
+        _progress_tracker = ProgressTracker()
+    return _progress_tracker
+
+@traced
 def add_individual(individuals, name, skills, proficiencies, available, shift):
     new_id = str(uuid.uuid4())[:8]
     new_individual = {
@@ -20,75 +50,300 @@ def add_individual(individuals, name, skills, proficiencies, available, shift):
     individuals.append(new_individual)
     return new_id
 
+@traced
 def update_feedback(individual_id, feedback_delta):
-    for ind in st.session_state.individuals:
-        if ind["id"] == individual_id:
-            ind["avg_feedback"] += feedback_delta
+    ind = st.session_state.individuals.get(individual_id)
+    if ind is not None:
+        ind["avg_feedback"] += feedback_delta
 
+@traced
 def auto_extract_skills(task_description):
     # Dummy function to simulate skill extraction
     return ["python", "machine learning"]
 
+@traced
+def cosine_similarity(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
+
+@traced
+def due_date_multiplier(due_date):
+    # Tasks get a boost as their due date approaches; overdue tasks get the largest one.
+    if due_date is None:
+        return 1.0
+    hours_left = (due_date - datetime.datetime.now()).total_seconds() / 3600
+    if hours_left <= 0:
+        return 1.5
+    if hours_left <= 24:
+        return 1.3
+    if hours_left <= 72:
+        return 1.15
+    return 1.0
+
+@traced
+def calculate_task_complexity(task_description):
+    # Dummy function to simulate task complexity estimation (0.0 - 0.5)
+    return min(len(task_description.split()) / 200, 0.5)
+
+@traced
 def summarize_task(task_description):
     # Dummy function to simulate task summarization
     return "This is a summary of the task."
 
+@traced
+def summarize_task_batch(task_descriptions):
+    # Dummy function to simulate batched task summarization
+    return [summarize_task(t) for t in task_descriptions]
+
+@traced
 def classify_task(task_description):
     # Dummy function to simulate task classification
     return "Web Development"
 
+@traced
+def classify_task_batch(task_descriptions):
+    # Dummy function to simulate batched task classification
+    return [classify_task(t) for t in task_descriptions]
+
+@traced
 def analyze_feedback_sentiment(feedback_text):
     # Dummy function to simulate feedback sentiment analysis
     return "Positive", 0.95
 
-def ai_allocate_task_with_explanation(task_description, task_urgency, task_shift, candidates, due_date):
-    # Dummy function to simulate AI task allocation
-    return None, 0.0, {}
+@traced
+def analyze_feedback_sentiment_batch(feedback_texts):
+    # Dummy function to simulate batched feedback sentiment analysis
+    return [analyze_feedback_sentiment(t) for t in feedback_texts]
+
+@traced
+def ai_allocate_task_with_explanation(task_description, task_urgency, task_shift, candidates, due_date,
+                                      model=None, feedback=None, embedding_store=None):
+    # Picks the best free individual for a single task; returns (individual, score, explanation).
+    from allocation import allocate_batch, pending_task
+    if model is None or not candidates:
+        return None, 0.0, {}
+    task = pending_task(task_description, task_urgency, task_shift, due_date)
+    _, individual, score, explanation = allocate_batch([task], candidates, model, feedback or {}, embedding_store)[0]
+    return individual, score, explanation
 
+@traced
+def allocate_pending_jobs(job_schedule, individuals, model, feedback=None, embedding_store=None):
+    # Assigns every unassigned scheduled job in one optimal batch and returns the
+    # explanation of each decision, keyed by job id.
+    pending = [job for job in job_schedule if not job.get("assigned")]
+    return allocate_jobs(pending, individuals, model, feedback, embedding_store, job_schedule)
+
+@traced
+def allocate_jobs(jobs, individuals, model, feedback=None, embedding_store=None, job_schedule=None):
+    # Assigns the given jobs in one optimal batch, marks the placed ones as assigned
+    # and returns the explanation of each decision, keyed by job id.
+    from allocation import allocate_batch
+    decisions = {}
+    # Versions are read before scoring; people changed by another session in the
+    # meantime are not assigned, and their jobs stay pending.
+    versions = {ind["id"]: ind.get("version", 0) for ind in individuals}
+    for job, individual, score, explanation in allocate_batch(jobs, individuals, model, feedback or {}, embedding_store):
+        if individual is not None:
+            predicted_time = assign_task(individual, job["task_description"], job.get("due_date"),
+                                         job.get("urgency", "Medium"), job.get("task_shift", "Any"),
+                                         expected_version=versions[individual["id"]])
+            if predicted_time is None:
+                decisions[job["job_id"]] = dict(explanation, conflict=True)
+                continue
+            job["assigned"] = True
+            job["assigned_to"] = individual["id"]
+            if hasattr(job_schedule, "save"):
+                job_schedule.save(job)
+        decisions[job["job_id"]] = explanation
+    return decisions
+
+def _claimable(individual, expected_version):
+    return individual["current_task"] is None and (
+        expected_version is None or individual["version"] == expected_version)
+
+@traced
+def assign_task(individual, task_description, due_date=None, urgency="Medium", task_shift="Any",
+                expected_version=None):
+    # Atomically records a new assignment, starts tracking its progress and returns
+    # the predicted completion time. Returns None without changing anything when the
+    # individual already has a task or, if expected_version is given, was changed
+    # since that version was read. Busy individuals are rejected before taking the
+    # lock; the check is repeated under it, and again against the stored record by
+    # Individual.compare_and_set, which also catches claims made by other processes.
+    # Every assign and release bumps "version".
+    if not _claimable(individual, expected_version):
+        return None
+    with record_lock(individual["id"]):
+        if not _claimable(individual, expected_version):
+            return None
+        predicted_time = simulate_task_completion(individual)
+        if not individual.compare_and_set({
+            "tasks_assigned": individual["tasks_assigned"] + 1,
+            "available": False,
+            "predicted_completion": predicted_time,
+            "current_task": task_description,
+            "progress": 0,
+        }, individual["version"]):
+            return None
+        get_progress_tracker().track(individual, task_description, due_date, urgency, task_shift)
+    return predicted_time
+
+@traced
+def release_task(individual, task=None, expected_version=None):
+    # Takes the current task away from an individual without counting it as completed.
+    # With task or expected_version, only releases if the individual is still on that
+    # task or at that version. Returns whether the task was released.
+    with record_lock(individual["id"]):
+        if individual["current_task"] is None or (task is not None and individual["current_task"] != task):
+            return False
+        if expected_version is not None and individual["version"] != expected_version:
+            return False
+        if not individual.compare_and_set({
+            "current_task": None,
+            "predicted_completion": None,
+            "progress": 0,
+            "available": True,
+        }, individual["version"]):
+            return False
+        get_progress_tracker().untrack(individual["id"])
+    return True
+
+@traced
+def set_availability(individual, available, expected_version=None):
+    # Changes availability unless the individual was changed since expected_version
+    # was read. Returns whether the individual now has the requested availability.
+    with record_lock(individual["id"]):
+        if expected_version is not None and individual["version"] != expected_version:
+            return individual["available"] == available
+        if individual["available"] != available:
+            return individual.compare_and_set({"available": available}, individual["version"])
+    return True
+
+@traced
 def simulate_task_completion(individual):
     # Dummy function to simulate task completion time prediction
     return 5.0
 
+@traced
 def simulate_email_notification(individual, task_description, predicted_time):
     # Dummy function to simulate email notification
     return f"Task '{task_description}' assigned to {individual['name']}. Predicted completion time: {predicted_time} hrs."
 
+@traced
 def generate_team_suggestions(individual):
     # Dummy function to simulate team suggestions generation
     return ["Improve Python skills", "Learn Docker"]
 
+@traced
+def generate_team_suggestions_batch(individuals):
+    # Dummy function to simulate batched team suggestions generation
+    return [generate_team_suggestions(ind) for ind in individuals]
+
+@traced
 def auto_feedback_generator(individual):
     # Dummy function to simulate auto feedback generation
     return "Great job on the last task!"
 
+@traced
+def auto_feedback_generator_batch(individuals):
+    # Dummy function to simulate batched auto feedback generation
+    return [auto_feedback_generator(ind) for ind in individuals]
+
+@traced
 def predict_future_tasks(individual):
     # Dummy function to simulate future task prediction
     return ["Task 1", "Task 2"]
 
+@traced
+def predict_future_tasks_batch(individuals):
+    # Dummy function to simulate batched future task prediction
+    return [predict_future_tasks(ind) for ind in individuals]
+
+@traced
 def suggest_optimal_shift(individual):
     # Dummy function to simulate shift suggestion
     return "Morning"
 
-def update_progress_for_all_tasks():
-    # Dummy function to simulate task progress update
-    pass
+@traced
+def suggest_optimal_shift_batch(individuals):
+    # Dummy function to simulate batched shift suggestion
+    return [suggest_optimal_shift(ind) for ind in individuals]
 
-def reassign_overdue_tasks():
-    # Dummy function to simulate task reassignment
-    pass
+@traced
+def update_progress_for_all_tasks(individuals=None):
+    # Applies queued progress events plus time-based estimates for tracked tasks and
+    # returns the ids of individuals whose task was completed.
+    if individuals is None:
+        individuals = st.session_state.individuals
+    tracker = get_progress_tracker()
+    tracker.estimate_progress()
+    return tracker.apply_events(individuals)
 
+@traced
+def reassign_overdue_tasks(individuals=None, model=None, feedback=None, embedding_store=None):
+    # Re-runs matching only for assignments whose deadline has passed. Each task moves
+    # to the best free individual other than its current holder; tasks nobody else
+    # can take stay where they are. Returns the explanation per task, keyed by the
+    # previous assignee's id.
+    from allocation import allocate_batch, pending_task
+    from resources import model as shared_model
+    if individuals is None:
+        individuals = st.session_state.individuals
+    if feedback is None:
+        feedback = st.session_state.feedback
+    tracker = get_progress_tracker()
+    overdue = tracker.pop_overdue()
+    if not overdue:
+        return {}
+    holders = {entry["individual_id"] for entry in overdue}
+    candidates = [ind for ind in individuals.free() if ind["id"] not in holders]
+    versions = {ind["id"]: ind.get("version", 0) for ind in candidates}
+    tasks = [pending_task(entry["task"], entry["urgency"], entry["task_shift"], entry["due_date"]) for entry in overdue]
+    try:
+        results = allocate_batch(tasks, candidates, model or shared_model, feedback, embedding_store)
+    except Exception:
+        for entry in overdue:
+            tracker.restore(entry)
+        raise
+    decisions = {}
+    for entry, (task, individual, score, explanation) in zip(overdue, results):
+        explanation = dict(explanation, task=entry["task"])
+        if individual is None or assign_task(individual, entry["task"], entry["due_date"], entry["urgency"],
+                                             entry["task_shift"], expected_version=versions[individual["id"]]) is None:
+            tracker.restore(entry)
+        else:
+            holder = individuals.get(entry["individual_id"])
+            if holder is not None:
+                release_task(holder, task=entry["task"])
+        decisions[entry["individual_id"]] = explanation
+    return decisions
+
+@traced
 def decompose_task(complex_task):
     # Dummy function to simulate task decomposition
     return ["Subtask 1", "Subtask 2"]
 
-def schedule_job(job):
-    # Dummy function to simulate job scheduling
+@traced
+def decompose_task_batch(complex_tasks):
+    # Dummy function to simulate batched task decomposition
+    return [decompose_task(t) for t in complex_tasks]
+
+@traced
+def schedule_job(job, scheduler=None):
+    # Records the job and, when a scheduler is running, queues it to be allocated
+    # automatically at its scheduled time.
     if "job_schedule" not in st.session_state:
         st.session_state.job_schedule = []
     st.session_state.job_schedule.append(job)
+    if scheduler is not None:
+        scheduler.add(job)
 
-def submit_proposal(job_id, proposer_name, proposal_text, estimated_time):
-    # Dummy function to simulate proposal submission
+@traced
+def submit_proposal(job_id, proposer_name, proposal_text, estimated_time, proposal_index=None):
+    # Dummy function to simulate proposal submission. With a proposal index the job id
+    # is validated (ValueError if unknown) and the proposal is ranked for its job.
     if "proposals" not in st.session_state:
         st.session_state.proposals = []
     proposal = {
@@ -98,12 +353,22 @@ def submit_proposal(job_id, proposer_name, proposal_text, estimated_time):
         "estimated_time": estimated_time,
         "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
+    if proposal_index is not None:
+        proposal_index.add(proposal)
     st.session_state.proposals.append(proposal)
+    return proposal
 
+@traced
 def get_ai_response(user_message):
     # Dummy function to simulate AI response
     return "This is an AI response to your message."
 
+@traced
+def get_ai_response_batch(user_messages):
+    # Dummy function to simulate batched AI responses
+    return [get_ai_response(m) for m in user_messages]
+
+@traced
 def send_notification(user_id, message):
     # Dummy function to simulate sending a notification
     print(f"Notification sent to {user_id}: {message}")
\ No newline at end of file
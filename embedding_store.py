@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+
+def skills_hash(skills):
+    return hashlib.sha1(skills.encode("utf-8")).hexdigest()[:16]
+
+
+class EmbeddingStore:
+    # Skill embeddings kept on disk as a raw float32 matrix (memory-mapped on load)
+    # next to an append-only JSONL index of individual id -> (row, skills hash).
+    # Rows are re-encoded only when an individual's skills string changes.
+    def __init__(self, directory="data", name="skill_embeddings"):
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, name + ".f32")
+        self.index_path = os.path.join(directory, name + ".jsonl")
+        self.dim = None
+        self.rows = {}
+        self.n_rows = 0
+        self._matrix = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if "dim" in entry:
+                    self.dim = entry["dim"]
+                    continue
+                self.rows[entry["id"]] = (entry["row"], entry["hash"])
+                self.n_rows = max(self.n_rows, entry["row"] + 1)
+        # The matrix is written before the index, but a crash mid-write can still
+        # leave index rows pointing past the end of the file. Drop those; they
+        # will simply be re-encoded on next use.
+        stored = 0
+        if self.dim and os.path.exists(self.matrix_path):
+            stored = os.path.getsize(self.matrix_path) // (4 * self.dim)
+        if stored < self.n_rows:
+            self.rows = {k: v for k, v in self.rows.items() if v[0] < stored}
+            self.n_rows = stored
+        self._open_matrix()
+
+    def _open_matrix(self):
+        if self.n_rows == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(self.n_rows, self.dim))
+
+    def is_current(self, individual):
+        entry = self.rows.get(individual["id"])
+        return entry is not None and entry[1] == skills_hash(individual["skills"])
+
+    def update(self, individuals, model):
+        pending = {ind["id"]: ind for ind in individuals}
+        if not pending:
+            return
+        embeddings = np.asarray(model.encode([ind["skills"] for ind in pending.values()]), dtype=np.float32)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            index_lines = []
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+                index_lines.append({"dim": self.dim})
+            entries = []
+            appended = []
+            for ind, emb in zip(pending.values(), embeddings):
+                if ind["id"] in self.rows:
+                    row = self.rows[ind["id"]][0]
+                    self._matrix[row] = emb
+                else:
+                    row = self.n_rows + len(appended)
+                    appended.append(emb)
+                entries.append((ind["id"], row, skills_hash(ind["skills"])))
+            if self._matrix is not None:
+                self._matrix.flush()
+            if appended:
+                with open(self.matrix_path, "ab") as f:
+                    f.write(np.stack(appended).astype(np.float32).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.n_rows += len(appended)
+                self._open_matrix()
+            index_lines.extend({"id": i, "row": row, "hash": h} for i, row, h in entries)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(line) + "\n" for line in index_lines))
+            for i, row, h in entries:
+                self.rows[i] = (row, h)
+
+    def embeddings_for(self, individuals, model):
+        # Returns one embedding row per individual, encoding only the ones that are
+        # missing or whose skills changed since they were last stored.
+        with self._lock:
+            stale = [ind for ind in individuals if not self.is_current(ind)]
+            if stale:
+                self.update(stale, model)
+            rows = [self.rows[ind["id"]][0] for ind in individuals]
+            if not rows:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.asarray(self._matrix[rows])
@@ -0,0 +1,256 @@
+import datetime
+import os
+import threading
+
+from allocation import pending_task
+from analytics import PerformanceAggregates
+from ann_index import DEFAULT_NPROBE, EXACT_THRESHOLD, CandidateIndex
+from core_functions import ai_allocate_task_with_explanation, assign_task, get_progress_tracker
+from feature_cache import task_feature_cache
+from history_log import HistoryLog
+from roster import Roster, record_lock
+from scoring import CandidateMatrix, task_features, top_k
+from sharded import DEFAULT_WORKERS, ShardedScorer
+from storage import StoredDict, StoredList
+from tracing import traced
+
+# Only the best matches are ranked and returned for a task.
+MAX_RANKED_MATCHES = 50
+# Candidates fetched by approximate retrieval and reranked with the full score.
+ANN_CANDIDATES = 256
+
+_sync_lock = threading.Lock()
+
+# Seed roster used the first time the app starts against an empty store.
+SEED_INDIVIDUALS = [
+    {"id": "1a2b3c4d", "name": "Alice", "skills": "python, machine learning, flask",
+     "proficiencies": [4.5, 4.0, 3.5], "available": True, "shift": "Morning",
+     "tasks_assigned": 0, "tasks_completed": 0, "avg_feedback": 4.2, "predicted_completion": None,
+     "current_task": None, "progress": 0},
+    {"id": "2b3c4d5e", "name": "Bob", "skills": "javascript, react, nodejs",
+     "proficiencies": [4.0, 3.5, 4.0], "available": True, "shift": "Morning",
+     "tasks_assigned": 1, "tasks_completed": 1, "avg_feedback": 3.8, "predicted_completion": None,
+     "current_task": None, "progress": 0},
+    {"id": "3c4d5e6f", "name": "Charlie", "skills": "java, spring boot",
+     "proficiencies": [3.0, 3.5], "available": False, "shift": "Night",
+     "tasks_assigned": 2, "tasks_completed": 2, "avg_feedback": 3.2, "predicted_completion": None,
+     "current_task": None, "progress": 0},
+    {"id": "4d5e6f7g", "name": "Diana", "skills": "c++, embedded systems",
+     "proficiencies": [4.5, 4.0], "available": True, "shift": "Night",
+     "tasks_assigned": 0, "tasks_completed": 0, "avg_feedback": 4.5, "predicted_completion": None,
+     "current_task": None, "progress": 0}
+]
+
+
+def load_state(storage, on_change=None, data_dir="data"):
+    # Builds the roster and collections from storage. Individuals are read up front to
+    # build the roster indexes; the other collections are read on first use. Every
+    # change to an individual is persisted, applied to the analytics aggregates and
+    # then passed to on_change.
+    storage.changed_elsewhere()
+    roster = Roster(storage.load("individuals"), storage=storage)
+    feedback = StoredDict(storage, "feedback")
+    if not len(roster):
+        for seed in SEED_INDIVIDUALS:
+            storage.put("individuals", seed["id"], roster.append(seed))
+            feedback[seed["id"]] = 0.0
+
+    analytics = PerformanceAggregates(roster)
+
+    def changed(ind):
+        storage.put("individuals", ind["id"], ind)
+        analytics.update(ind)
+        if on_change is not None:
+            on_change(ind)
+
+    roster.on_change = changed
+    # Assignment times are not persisted, so tasks active at startup are tracked from now.
+    for ind in roster.active():
+        get_progress_tracker().track(ind, ind["current_task"])
+    return {
+        "individuals": roster,
+        "feedback": feedback,
+        "match_history": HistoryLog(os.path.join(data_dir, "match_history")),
+        "chat_history": StoredList(storage, "chat_history"),
+        "job_schedule": StoredList(storage, "job_schedule", key_field="job_id"),
+        "proposals": StoredList(storage, "proposals"),
+        "analytics": analytics,
+    }
+
+
+def sync_roster(roster, feedback=None):
+    # Applies individuals that other processes (the API server, or the app as its
+    # client) wrote to the roster's storage since this process last looked. New
+    # people are added and changed records updated in place, so indexes, listeners and
+    # progress tracking see them like local edits; feedback, if given, is reloaded.
+    # Cheap when nothing changed elsewhere. Returns the number of records applied.
+    storage = roster.storage
+    if storage is None or not storage.changed_elsewhere():
+        return 0
+    if feedback is not None:
+        feedback.reload()
+    applied = 0
+    with _sync_lock, storage.batch():
+        for record in storage.load("individuals"):
+            individual = roster.get(record["id"])
+            if individual is None:
+                individual = roster.append(record)
+                if individual["current_task"] is not None:
+                    get_progress_tracker().track(individual, individual["current_task"])
+                applied += 1
+                continue
+            with record_lock(individual["id"]):
+                if record.get("version", 0) < individual["version"] or \
+                        all(individual.get(key) == value for key, value in record.items()):
+                    continue
+                task = individual["current_task"]
+                for key, value in record.items():
+                    individual[key] = value
+                if individual["current_task"] != task:
+                    get_progress_tracker().untrack(individual["id"])
+                    if individual["current_task"] is not None:
+                        get_progress_tracker().track(individual, individual["current_task"])
+            applied += 1
+    return applied
+
+
+class AllocationEngine:
+    # The scoring and allocation path used by the Task Matching tab, independent of
+    # Streamlit so it can also be driven by the HTTP API or batch jobs. With an
+    # embedding store, shifts with at least exact_threshold free individuals are
+    # matched in two stages: the ANN index returns the ann_candidates nearest by skill
+    # similarity and only those are scored with the full formula. Smaller shifts, or
+    # retrieval="exact", score every free individual. retrieval="sharded" scores every
+    # free individual exactly, split across a pool of worker processes.
+    def __init__(self, state, model, embedding_store=None, max_matches=MAX_RANKED_MATCHES, retrieval="auto",
+                 nprobe=DEFAULT_NPROBE, exact_threshold=EXACT_THRESHOLD, ann_candidates=ANN_CANDIDATES,
+                 workers=DEFAULT_WORKERS):
+        self.individuals = state["individuals"]
+        self.feedback = state["feedback"]
+        self.match_history = state["match_history"]
+        self.model = model
+        self.embedding_store = embedding_store
+        self.max_matches = max_matches
+        self.ann_candidates = ann_candidates
+        self._matrices = {}
+        self.index = None
+        self.sharded = None
+        if embedding_store is not None and retrieval == "sharded":
+            self.sharded = ShardedScorer(self.individuals, self.feedback, embedding_store, model, workers)
+            self.individuals.subscribe(self.sharded.sync)
+        elif embedding_store is not None and retrieval != "exact":
+            self.index = CandidateIndex(embedding_store, model, nprobe, exact_threshold)
+            self.individuals.subscribe(self.index.sync)
+            for ind in self.individuals:
+                self.index.sync(ind)
+
+    def _skill_embeddings(self, candidates):
+        if self.embedding_store is not None:
+            return self.embedding_store.embeddings_for(candidates, self.model)
+        return self.model.encode([ind["skills"] for ind in candidates])
+
+    @traced
+    def match_many(self, tasks):
+        # Ranks free individuals for each task. Task descriptions are encoded in one
+        # call and candidates are scored once per distinct shift in the batch.
+        embeddings = task_feature_cache.embeddings([task["task_description"] for task in tasks], self.model)
+        if self.sharded is not None:
+            return self._match_sharded(tasks, embeddings)
+        results = []
+        for task, embedding in zip(tasks, embeddings):
+            shift = task.get("task_shift", "Any")
+            limit = task.get("limit") or self.max_matches
+            if self._approximate(shift):
+                candidates, skill_embeddings = self.index.search(embedding, shift, max(self.ann_candidates, limit))
+                matrix = CandidateMatrix(candidates, skill_embeddings, self.feedback) if candidates else None
+            else:
+                matrix = self._matrix(shift)
+            if matrix is None:
+                results.append([])
+                continue
+            features = task_features(task["task_description"], task.get("urgency", "Medium"), task.get("due_date"), embedding)
+            scores = matrix.score(features)
+            results.append([(matrix.individuals[i], float(scores[i])) for i in top_k(scores, limit)])
+        return results
+
+    def _matrix(self, shift):
+        # Candidate matrix of a shift's free individuals, reused until the roster or
+        # the feedback offsets change.
+        version = (self.individuals.version, self.feedback.version)
+        cached = self._matrices.get(shift)
+        if cached is None or cached[0] != version:
+            candidates = self.individuals.free(shift)
+            matrix = CandidateMatrix(candidates, self._skill_embeddings(candidates), self.feedback) \
+                if candidates else None
+            cached = self._matrices[shift] = (version, matrix)
+        return cached[1]
+
+    def _match_sharded(self, tasks, embeddings):
+        # Tasks are sent to the workers in one batch per (shift, limit).
+        groups = {}
+        for row, task in enumerate(tasks):
+            groups.setdefault((task.get("task_shift", "Any"), task.get("limit") or self.max_matches), []).append(row)
+        results = [None] * len(tasks)
+        for (shift, limit), rows in groups.items():
+            features_list = [task_features(tasks[row]["task_description"], tasks[row].get("urgency", "Medium"),
+                                           tasks[row].get("due_date"), embeddings[row]) for row in rows]
+            for row, ranked in zip(rows, self.sharded.top_k(features_list, shift, limit)):
+                results[row] = ranked
+        return results
+
+    def _approximate(self, shift):
+        return self.index is not None and self.index.use_for(shift)
+
+    def _candidates(self, task_description, shift):
+        # Free individuals to allocate from: the ANN shortlist on large shifts, or the
+        # best ann_candidates by full score when sharded.
+        if self.sharded is not None:
+            return [ind for ind, _ in self.match(task_description, task_shift=shift, limit=self.ann_candidates)]
+        if not self._approximate(shift):
+            return self.individuals.free(shift)
+        embedding = task_feature_cache.embeddings([task_description], self.model)[0]
+        return self.index.search(embedding, shift, self.ann_candidates)[0]
+
+    def match(self, task_description, urgency="Medium", task_shift="Any", due_date=None, limit=None):
+        task = pending_task(task_description, urgency, task_shift, due_date)
+        task["limit"] = limit
+        return self.match_many([task])[0]
+
+    @traced
+    def allocate(self, task_description, urgency="Medium", task_shift="Any", due_date=None):
+        # Picks and assigns the best free individual. Returns (individual, score,
+        # explanation, predicted_time); individual is None when nobody is free. If the
+        # pick is assigned elsewhere while scoring, the next best free person is tried.
+        candidates = self._candidates(task_description, task_shift)
+        versions = {ind["id"]: ind["version"] for ind in candidates}
+        while True:
+            candidate, score, explanation = ai_allocate_task_with_explanation(
+                task_description, urgency, task_shift, candidates, due_date,
+                model=self.model, feedback=self.feedback, embedding_store=self.embedding_store
+            )
+            if candidate is None:
+                return None, 0.0, explanation, None
+            predicted_time = assign_task(candidate, task_description, due_date, urgency, task_shift,
+                                         expected_version=versions[candidate["id"]])
+            if predicted_time is not None:
+                return candidate, score, explanation, predicted_time
+            candidates = [ind for ind in candidates if ind is not candidate]
+
+    def assign(self, individual, task_description, due_date=None, urgency="Medium", task_shift="Any"):
+        # Returns None if the individual was taken by another session first.
+        return assign_task(individual, task_description, due_date, urgency, task_shift)
+
+    @traced
+    def record_match(self, task_description, category, urgency, matches, due_date, predicted_completion=None):
+        record = {
+            "task": task_description,
+            "category": category if category else task_feature_cache.category(task_description),
+            "urgency": urgency,
+            "matches": [(ind["id"], score) for ind, score in matches],
+        }
+        if predicted_completion is not None:
+            record["predicted_completion"] = predicted_completion
+        record["due_date"] = due_date.strftime("%Y-%m-%d %H:%M") if due_date else "N/A"
+        record["timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.match_history.append(record)
+        return record
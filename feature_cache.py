@@ -0,0 +1,121 @@
+import collections
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from core_functions import auto_extract_skills, calculate_task_complexity, classify_task, summarize_task
+from tracing import register_stats
+
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def feature_key(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TaskFeatureCache:
+    # Content-addressed cache of per-task features (skills, summary, category,
+    # complexity, embedding) keyed by a hash of the whitespace-normalized text.
+    # Entries are evicted least-recently-used beyond max_entries and expire ttl
+    # seconds after they were first computed. Each feature is computed on first use.
+    def __init__(self, max_entries=2048, ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = collections.Counter()
+        self.misses = collections.Counter()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _entry(self, key):
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry["expires"] <= now:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            entry = self._entries[key] = {"expires": now + self.ttl, "values": {}}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _lookup(self, key, field):
+        with self._lock:
+            values = self._entry(key)["values"]
+            if field in values:
+                self.hits[field] += 1
+                return True, values[field]
+            self.misses[field] += 1
+            return False, None
+
+    def _store(self, key, field, value):
+        with self._lock:
+            self._entry(key)["values"][field] = value
+
+    def get(self, text, field, compute):
+        key = feature_key(text)
+        found, value = self._lookup(key, field)
+        if not found:
+            value = compute(text)
+            self._store(key, field, value)
+        return value
+
+    def skills(self, text):
+        return list(self.get(text, "skills", lambda t: tuple(auto_extract_skills(t))))
+
+    def summary(self, text):
+        return self.get(text, "summary", summarize_task)
+
+    def category(self, text):
+        return self.get(text, "category", classify_task)
+
+    def complexity(self, text):
+        return self.get(text, "complexity", calculate_task_complexity)
+
+    def embedding(self, text, model):
+        return self.embeddings([text], model)[0]
+
+    def embeddings(self, texts, model):
+        # Encodes every cache miss in a single model.encode call.
+        keys = [feature_key(text) for text in texts]
+        found = [self._lookup(key, "embedding") for key in keys]
+        missing = {key: text for key, text, (hit, _) in zip(keys, texts, found) if not hit}
+        encoded = {}
+        if missing:
+            vectors = np.asarray(model.encode(list(missing.values())), dtype=np.float32)
+            vectors = vectors.reshape(len(missing), -1)
+            for key, vector in zip(missing, vectors):
+                vector.setflags(write=False)
+                self._store(key, "embedding", vector)
+                encoded[key] = vector
+        return np.stack([value if hit else encoded[key] for key, (hit, value) in zip(keys, found)])
+
+    def stats(self):
+        with self._lock:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "by_feature": {field: {"hits": self.hits[field], "misses": self.misses[field]}
+                               for field in sorted(set(self.hits) | set(self.misses))},
+            }
+
+
+# Shared by every session in the process.
+task_feature_cache = TaskFeatureCache()
+register_stats("feature_cache", task_feature_cache.stats)
@@ -0,0 +1,139 @@
+import csv
+import datetime
+import json
+import os
+import threading
+
+EXPORT_COLUMNS = ["task", "category", "urgency", "matches", "predicted_completion", "due_date", "timestamp"]
+
+
+class HistoryLog:
+    # Append-only match history split into one JSONL segment per day. Records are
+    # never rewritten; each segment keeps an index of line offsets so a page reads
+    # only its own records, and exports stream one chunk at a time, so nothing holds
+    # the full history in memory. A last line without a newline is a write torn by a
+    # crash: readers skip it and the next append truncates it.
+    def __init__(self, directory=os.path.join("data", "match_history")):
+        self.directory = directory
+        self._offsets = {}
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, segment + ".jsonl")
+
+    def segments(self):
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+
+    def _index(self, segment):
+        # Returns (end of the last complete line, offsets of the non-blank complete
+        # lines), scanning only what was written since the last call.
+        path = self._segment_path(segment)
+        with self._lock:
+            scanned, offsets = self._offsets.get(segment, (0, []))
+            if os.path.getsize(path) > scanned:
+                with open(path, "rb") as f:
+                    f.seek(scanned)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        if line.strip():
+                            offsets.append(scanned)
+                        scanned += len(line)
+                self._offsets[segment] = (scanned, offsets)
+            return scanned, offsets
+
+    def _count(self, segment):
+        return len(self._index(segment)[1])
+
+    def _read(self, segment, positions):
+        # Decodes the records at the given line positions of a segment.
+        offsets = self._index(segment)[1]
+        records = []
+        with open(self._segment_path(segment), "rb") as f:
+            for position in positions:
+                f.seek(offsets[position])
+                records.append(json.loads(f.readline()))
+        return records
+
+    def append(self, record):
+        segment = datetime.datetime.now().strftime("%Y-%m-%d")
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        path = self._segment_path(segment)
+        with self._lock:
+            if not os.path.exists(path):
+                open(path, "ab").close()
+            scanned, offsets = self._index(segment)
+            with open(path, "r+b") as f:
+                f.truncate(scanned)
+                f.seek(scanned)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            offsets.append(scanned)
+            self._offsets[segment] = (scanned + len(line), offsets)
+
+    def __len__(self):
+        return sum(self._count(segment) for segment in self.segments())
+
+    def __bool__(self):
+        return any(self._count(segment) for segment in self.segments())
+
+    def page(self, page, page_size):
+        # Records for the given zero-based page, newest first. Whole segments before
+        # the page are skipped using their line counts.
+        skip = page * page_size
+        records = []
+        for segment in reversed(self.segments()):
+            count = self._count(segment)
+            if skip >= count:
+                skip -= count
+                continue
+            newest = count - 1 - skip
+            oldest = max(newest - (page_size - len(records)) + 1, 0)
+            records.extend(self._read(segment, range(newest, oldest - 1, -1)))
+            skip = 0
+            if len(records) >= page_size:
+                break
+        return records
+
+    def iter_chunks(self, chunk_size=1000):
+        # Oldest-first chunks of at most chunk_size records.
+        chunk = []
+        for segment in self.segments():
+            with open(self._segment_path(segment), encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    if not line.strip():
+                        continue
+                    chunk.append(json.loads(line))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        if chunk:
+            yield chunk
+
+    def export_csv(self, path, chunk_size=1000):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for chunk in self.iter_chunks(chunk_size):
+                writer.writerows(export_row(record) for record in chunk)
+        return path
+
+    def export_parquet(self, path, chunk_size=1000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in self.iter_chunks(chunk_size):
+                rows = [export_row(record) for record in chunk]
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        return path
+
+
+def export_row(record):
+    row = {column: record.get(column) for column in EXPORT_COLUMNS}
+    row["matches"] = json.dumps(record.get("matches", []))
+    return {column: None if value is None else str(value) for column, value in row.items()}
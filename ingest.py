@@ -0,0 +1,218 @@
+# Bulk roster import from HR exports.
+#
+#   python ingest.py people.csv --chunk-size 5000
+#
+# Files are read in chunks (CSV, JSONL or Parquet), each chunk is validated with
+# column-wise pandas operations, duplicates are dropped, skill embeddings for the
+# new people are encoded in one batch and the chunk is committed in one transaction.
+import argparse
+import os
+import time
+import uuid
+
+from resources import lazy_import
+from roster import normalize_name
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+SHIFTS = ("Morning", "Night")
+TRUE_VALUES = {"true", "1", "yes", "y", "t"}
+MAX_REJECTS_REPORTED = 100
+
+
+def detect_format(name):
+    fmt = FORMATS.get(os.path.splitext(name)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {name}")
+    return fmt
+
+
+def iter_chunks(source, fmt, chunk_size=5000):
+    # Yields DataFrames of at most chunk_size rows with every column read as text.
+    pd = lazy_import("pandas")
+    if fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    elif fmt == "jsonl":
+        for chunk in pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False):
+            yield text_columns(chunk)
+    elif fmt == "parquet":
+        pq = lazy_import("pyarrow.parquet")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield text_columns(batch.to_pandas())
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def text_columns(chunk):
+    # JSONL and Parquet keep lists, such as the proficiencies of an exported roster,
+    # as lists or arrays; those are joined with commas as in a CSV file before the
+    # remaining values are converted to text. Missing values become "".
+    pd = lazy_import("pandas")
+    np = lazy_import("numpy")
+    columns = {}
+    for column, values in chunk.items():
+        if values.dtype == object:
+            values = values.map(lambda v: ", ".join(map(str, v)) if isinstance(v, (list, tuple, np.ndarray)) else v)
+        columns[column] = values.astype(str).where(values.notna(), "")
+    return pd.DataFrame(columns, index=chunk.index)
+
+
+def validate_chunk(chunk):
+    # Returns (valid rows with parsed skills and proficiencies, [(position, reason)])
+    # where position is the zero-based row within the chunk.
+    pd = lazy_import("pandas")
+    np = lazy_import("numpy")
+    chunk = chunk.rename(columns=lambda column: str(column).strip().lower())
+    for column in ("name", "skills", "proficiencies", "shift", "available", "external_id"):
+        if column not in chunk:
+            chunk[column] = ""
+    name = chunk["name"].str.strip()
+    skills = chunk["skills"].str.split(",").map(lambda items: [s.strip() for s in items if s.strip()])
+    skill_counts = skills.map(len)
+    # The roster CSV download writes proficiencies as a bracketed list.
+    proficiency_text = chunk["proficiencies"].str.strip().str.strip("[]").str.strip()
+    levels = proficiency_text.str.split(",", expand=True).apply(pd.to_numeric, errors="coerce")
+    level_counts = proficiency_text.str.count(",") + 1
+    level_counts[proficiency_text == ""] = 0
+    level_array = levels.to_numpy(dtype=float)
+    in_range = (level_array >= 1) & (level_array <= 5)
+    within = np.arange(level_array.shape[1])[None, :] < level_counts.to_numpy()[:, None]
+    levels_ok = np.all(in_range | ~within, axis=1)
+    shift = chunk["shift"].str.strip().str.capitalize()
+    shift[shift == ""] = SHIFTS[0]
+
+    reason = pd.Series("", index=chunk.index)
+    reason[~shift.isin(SHIFTS)] = "shift must be Morning or Night"
+    reason[~levels_ok] = "proficiencies must be numbers between 1 and 5"
+    reason[level_counts != skill_counts] = "proficiency count does not match skill count"
+    reason[level_counts == 0] = "missing proficiencies"
+    reason[skill_counts == 0] = "missing skills"
+    reason[name == ""] = "missing name"
+    bad = reason != ""
+    rejects = list(zip(np.flatnonzero(bad.to_numpy()).tolist(), reason[bad].tolist()))
+
+    valid = pd.DataFrame({
+        "name": name,
+        "skills": skills,
+        "skill_count": skill_counts,
+        "shift": shift,
+        "available": chunk["available"].str.strip().str.lower().map(lambda v: v in TRUE_VALUES or v == ""),
+        "external_id": chunk["external_id"].str.strip(),
+        "name_key": name.map(normalize_name),
+    })[~bad]
+    valid["proficiencies"] = [row[:count].tolist()
+                              for row, count in zip(level_array[~bad.to_numpy()], level_counts[~bad])]
+    return valid, rejects
+
+
+def new_id(taken):
+    while True:
+        candidate = str(uuid.uuid4())[:8]
+        if candidate not in taken:
+            return candidate
+
+
+class RosterImporter:
+    # Streams files into a roster. Rows are duplicates when their external_id was
+    # already seen, or, for rows without one, when the normalized name was.
+    def __init__(self, individuals, storage, feedback=None, embedding_store=None, model=None):
+        self.individuals = individuals
+        self.storage = storage
+        self.feedback = feedback
+        self.embedding_store = embedding_store
+        self.model = model
+        self.taken_ids = {ind["id"] for ind in individuals}
+        self.external_ids = {ind.get("external_id") for ind in individuals if ind.get("external_id")}
+        self.names = {normalize_name(ind["name"]) for ind in individuals}
+
+    def _unique(self, valid):
+        keep = []
+        for external_id, name_key in zip(valid["external_id"], valid["name_key"]):
+            if external_id:
+                duplicate = external_id in self.external_ids
+                self.external_ids.add(external_id)
+            else:
+                duplicate = name_key in self.names
+            self.names.add(name_key)
+            keep.append(not duplicate)
+        return valid[keep]
+
+    def _commit(self, valid):
+        added = []
+        with self.storage.batch():
+            for row in valid.itertuples(index=False):
+                record = {
+                    "id": new_id(self.taken_ids),
+                    "name": row.name,
+                    "skills": ", ".join(row.skills),
+                    "proficiencies": row.proficiencies,
+                    "available": bool(row.available),
+                    "shift": row.shift,
+                    "tasks_assigned": 0,
+                    "tasks_completed": 0,
+                    "avg_feedback": 0.0,
+                    "predicted_completion": None,
+                    "current_task": None,
+                    "progress": 0,
+                }
+                if row.external_id:
+                    record["external_id"] = row.external_id
+                self.taken_ids.add(record["id"])
+                added.append(self.individuals.append(record))
+                if self.feedback is not None:
+                    self.feedback[record["id"]] = 0.0
+        return added
+
+    def run(self, source, fmt, chunk_size=5000, on_chunk=None):
+        # Imports every chunk and returns counts, timings and the first rejected rows.
+        started = time.perf_counter()
+        report = {"rows": 0, "added": 0, "duplicates": 0, "rejected": 0, "encode_s": 0.0, "rejects": []}
+        for chunk in iter_chunks(source, fmt, chunk_size):
+            valid, rejects = validate_chunk(chunk)
+            unique = self._unique(valid)
+            added = self._commit(unique)
+            if added and self.embedding_store is not None:
+                encode_started = time.perf_counter()
+                self.embedding_store.update(added, self.model)
+                report["encode_s"] += time.perf_counter() - encode_started
+            offset = report["rows"]
+            report["rows"] += len(chunk)
+            report["added"] += len(added)
+            report["duplicates"] += len(valid) - len(unique)
+            report["rejected"] += len(rejects)
+            room = MAX_REJECTS_REPORTED - len(report["rejects"])
+            report["rejects"].extend({"row": offset + position + 1, "reason": reason}
+                                     for position, reason in rejects[:max(room, 0)])
+            if on_chunk is not None:
+                on_chunk(report)
+        report["seconds"] = time.perf_counter() - started
+        report["rows_per_sec"] = round(report["rows"] / report["seconds"]) if report["seconds"] else None
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())))
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from core_functions import get_storage
+    from embedding_store import EmbeddingStore
+    from engine import load_state
+    from resources import model
+    from storage import claim_data_dir
+
+    claim_data_dir("data")
+    storage = get_storage()
+    state = load_state(storage)
+    importer = RosterImporter(state["individuals"], storage, state["feedback"], EmbeddingStore("data"), model)
+    report = importer.run(args.path, args.format or detect_format(args.path), args.chunk_size,
+                          on_chunk=lambda r: print(f"{r['rows']} rows read, {r['added']} added"))
+    print(f"{report['rows']} rows in {report['seconds']:.1f} s ({report['rows_per_sec']} rows/sec): "
+          f"{report['added']} added, {report['duplicates']} duplicates, {report['rejected']} rejected")
+    for reject in report["rejects"][:10]:
+        print(f"  row {reject['row']}: {reject['reason']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
+import time
+
+rerun_started = time.perf_counter()
+
 import datetime
+import os
+import tempfile
 import uuid
 import streamlit as st
 
@@ -6,59 +12,118 @@ st.set_page_config(page_title="AI Agent for Task Allocation", layout="wide")
 
 # Rest of your code
 
-import pandas as pd
-import altair as alt
+from analytics import ANALYTICS_COLUMNS, CHART_SIZE, records_csv
 from core_functions import (
-    add_individual, update_feedback, auto_extract_skills, summarize_task, classify_task,
-    analyze_feedback_sentiment, ai_allocate_task_with_explanation, simulate_task_completion,
-    send_notification, get_ai_response, decompose_task, auto_feedback_generator,
-    predict_future_tasks, suggest_optimal_shift, generate_team_suggestions,
+    add_individual, update_feedback, send_notification,
     update_progress_for_all_tasks, reassign_overdue_tasks, simulate_email_notification,
-    schedule_job, submit_proposal
+    schedule_job, submit_proposal, allocate_pending_jobs, allocate_jobs, get_storage,
+    set_availability,
+    get_progress_tracker,
+    analyze_feedback_sentiment_batch, decompose_task_batch, get_ai_response_batch
 )
+from allocation_client import AllocationClient, AllocationServiceError
+from embedding_store import EmbeddingStore
+from engine import AllocationEngine, load_state, sync_roster
+from feature_cache import task_feature_cache
+from ingest import RosterImporter, detect_format
+from micro_batcher import batcher_for, batcher_stats
+from proposals import ProposalIndex
+from resources import lazy_import, model, record_rerun, timing_report, warm_up
+from roster import FIELDS
+from scheduler import JobScheduler
+from storage import DataDirInUse, claim_data_dir
+from team_insights import TeamInsights
+import tracing
+from tracing import span
+
+HISTORY_PAGE_SIZE = 20
+TOP_PROPOSALS = 5
+ANALYTICS_PAGE_SIZE = 50
+
+# With ALLOCATION_API_URL set, matching and allocation go through the allocation API
+# (api.py), which owns data/; otherwise the app runs the engine itself and owns it.
+ALLOCATION_API_URL = os.environ.get("ALLOCATION_API_URL")
+
+if not ALLOCATION_API_URL:
+    try:
+        claim_data_dir("data")
+    except DataDirInUse as e:
+        st.error(str(e))
+        st.stop()
+
+@st.cache_resource
+def get_embedding_store():
+    # Shared across sessions so skill embeddings are encoded once per roster change.
+    # The API server keeps the store when the app is its client.
+    if ALLOCATION_API_URL:
+        return None
+    return EmbeddingStore("data")
+
+embedding_store = get_embedding_store()
+# Load the sentence encoder in the background; model.encode waits for it if needed.
+warm_up()
+
+@st.cache_resource
+def load_shared_state():
+    # Loaded once per process and shared by every session.
+    team_insights = TeamInsights()
+    state = load_state(get_storage(), on_change=team_insights.notify)
+    for ind in state["individuals"]:
+        team_insights.notify(ind)
+    state["team_insights"] = team_insights
+    return state
+
+@st.cache_resource
+def get_engine():
+    if ALLOCATION_API_URL:
+        return AllocationClient(ALLOCATION_API_URL, load_shared_state()["individuals"])
+    return AllocationEngine(load_shared_state(), model, embedding_store)
 
 # Initialize session state variables if not already present.
-if "individuals" not in st.session_state:
-    st.session_state.individuals = [
-        {"id": "1a2b3c4d", "name": "Alice", "skills": "python, machine learning, flask", 
-         "proficiencies": [4.5, 4.0, 3.5], "available": True, "shift": "Morning",
-         "tasks_assigned": 0, "tasks_completed": 0, "avg_feedback": 4.2, "predicted_completion": None,
-         "current_task": None, "progress": 0},
-        {"id": "2b3c4d5e", "name": "Bob", "skills": "javascript, react, nodejs", 
-         "proficiencies": [4.0, 3.5, 4.0], "available": True, "shift": "Morning",
-         "tasks_assigned": 1, "tasks_completed": 1, "avg_feedback": 3.8, "predicted_completion": None,
-         "current_task": None, "progress": 0},
-        {"id": "3c4d5e6f", "name": "Charlie", "skills": "java, spring boot", 
-         "proficiencies": [3.0, 3.5], "available": False, "shift": "Night",
-         "tasks_assigned": 2, "tasks_completed": 2, "avg_feedback": 3.2, "predicted_completion": None,
-         "current_task": None, "progress": 0},
-        {"id": "4d5e6f7g", "name": "Diana", "skills": "c++, embedded systems", 
-         "proficiencies": [4.5, 4.0], "available": True, "shift": "Night",
-         "tasks_assigned": 0, "tasks_completed": 0, "avg_feedback": 4.5, "predicted_completion": None,
-         "current_task": None, "progress": 0}
-    ]
-if "feedback" not in st.session_state:
-    st.session_state.feedback = {ind["id"]: 0.0 for ind in st.session_state.individuals}
-if "match_history" not in st.session_state:
-    st.session_state.match_history = []
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
-if "job_schedule" not in st.session_state:
-    st.session_state.job_schedule = []
-if "proposals" not in st.session_state:
-    st.session_state.proposals = []
+for key, value in load_shared_state().items():
+    if key not in st.session_state:
+        st.session_state[key] = value
+# Pick up assignments and roster edits made by the API server or other processes.
+sync_roster(st.session_state.individuals, st.session_state.feedback)
+
+@st.cache_resource
+def start_job_scheduler():
+    # One scheduler per process. Jobs are allocated in batches as their scheduled
+    # time arrives; jobs nobody could take are retried later.
+    state = load_shared_state()
+
+    def dispatch(jobs):
+        jobs = [job for job in jobs if not job.get("assigned")]
+        allocate_jobs(jobs, state["individuals"].free(), model, state["feedback"], embedding_store, state["job_schedule"])
+        get_storage().flush()
+        return [job for job in jobs if not job.get("assigned")]
+
+    scheduler = JobScheduler(dispatch)
+    for job in state["job_schedule"]:
+        if not job.get("assigned"):
+            scheduler.add(job)
+    return scheduler.start()
+
+@st.cache_resource
+def get_proposal_index():
+    state = load_shared_state()
+    return ProposalIndex(state["proposals"], state["job_schedule"], state["individuals"], model)
+
+job_scheduler = start_job_scheduler()
+engine = get_engine()
+proposal_index = get_proposal_index()
 
 # Define the application tabs.
 tabs = st.tabs([
     "Task Matching", "Manage Availability", "Manage Individuals", "Match History",
     "Performance Analytics", "Team Suggestions", "Chat with AI Agent", "Task Monitoring",
-    "Advanced AI Features", "Job Scheduling & Proposals"
+    "Advanced AI Features", "Job Scheduling & Proposals", "Admin"
 ])
 
 # ---------------------------
 # TAB 1: Task Matching with Due Date Priority
 # ---------------------------
-with tabs[0]:
+with tabs[0], span("tab.task_matching"):
     st.header("Task Matching")
     st.markdown("""
         **Objective:** Match tasks to individuals based on expertise, availability, and due date priority.
@@ -75,13 +140,13 @@ with tabs[0]:
     due_date = datetime.datetime.combine(due_date_input, due_time_input) if due_date_input else None
 
     if task_description:
-        recommended_skills = auto_extract_skills(task_description)
+        recommended_skills = task_feature_cache.skills(task_description)
         if recommended_skills:
             st.info(f"Recommended Skills: {', '.join(recommended_skills)}")
-        summary = summarize_task(task_description)
+        summary = task_feature_cache.summary(task_description)
         st.write(f"*Task Summary:* {summary}")
         if not task_category.strip():
-            predicted_category = classify_task(task_description)
+            predicted_category = task_feature_cache.category(task_description)
             st.write(f"*Predicted Task Category:* {predicted_category}")
     
     col_manual, col_auto = st.columns(2)
@@ -90,94 +155,68 @@ with tabs[0]:
             if not task_description.strip():
                 st.error("Please enter a valid task description.")
             else:
-                available_inds = [ind for ind in st.session_state.individuals 
-                                    if ind["available"] and ind["current_task"] is None 
-                                    and (task_shift == "Any" or ind["shift"] == task_shift)]
-                if not available_inds:
-                    st.info("No available individuals found for the specified shift.")
+                try:
+                    ranked = engine.match(task_description, task_urgency, task_shift, due_date)
+                except AllocationServiceError as e:
+                    st.error(str(e))
                 else:
-                    task_embedding = model.encode(task_description)
-                    skills_list = [ind["skills"] for ind in available_inds]
-                    skill_embeddings = model.encode(skills_list)
-                    sim_scores = [cosine_similarity(task_embedding, emb) for emb in skill_embeddings]
-                    urgency_weight = {"Low": 0.9, "Medium": 1.0, "High": 1.1}[task_urgency]
-                    adjusted_scores = []
-                    for ind, score in zip(available_inds, sim_scores):
-                        adjustment = st.session_state.feedback.get(ind["id"], 0.0)
-                        proficiency_bonus = sum(ind["proficiencies"]) / (len(ind["proficiencies"]) * 10) if ind["proficiencies"] else 0
-                        match_bonus = 0.1 * len([skill for skill in auto_extract_skills(task_description) if skill.lower() in ind["skills"].lower()])
-                        dd_mult = due_date_multiplier(due_date)
-                        final_score = (score + adjustment + proficiency_bonus + match_bonus) * urgency_weight * dd_mult * (1 + calculate_task_complexity(task_description))
-                        adjusted_scores.append(final_score)
-                    ranked = sorted(zip(available_inds, adjusted_scores), key=lambda x: x[1], reverse=True)
-                    st.subheader("Matched Individuals (Manual):")
-                    for ind, score in ranked:
-                        col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
-                        col1.write(f"*Name:* {ind['name']} | *Skills:* {ind['skills']} | *Shift:* {ind['shift']}")
-                        col1.write(f"*Score:* {score:.2f}")
-                        if col2.button("👍", key=f"like_{ind['id']}"):
-                            update_feedback(ind["id"], 0.05)
-                            st.success(f"Feedback recorded for {ind['name']} (+)")
-                        if col3.button("👎", key=f"dislike_{ind['id']}"):
-                            update_feedback(ind["id"], -0.05)
-                            st.warning(f"Feedback recorded for {ind['name']} (-)")
-                        if col4.button(f"Assign Task to {ind['name']}", key=f"assign_{ind['id']}"):
-                            if ind["current_task"] is None:
-                                ind["tasks_assigned"] += 1
-                                ind["available"] = False
-                                predicted_time = simulate_task_completion(ind)
-                                ind["predicted_completion"] = predicted_time
-                                ind["current_task"] = task_description
-                                ind["progress"] = 0
-                                st.info(f"Task assigned to {ind['name']}!")
-                                email_msg = simulate_email_notification(ind, task_description, predicted_time)
-                                st.text_area("Simulated Email Notification", value=email_msg, height=150)
-                    st.session_state.match_history.append({
-                        "task": task_description,
-                        "category": task_category if task_category.strip() else predicted_category,
-                        "urgency": task_urgency,
-                        "matches": [(ind["id"], score) for ind, score in ranked],
-                        "due_date": due_date.strftime("%Y-%m-%d %H:%M") if due_date else "N/A",
-                        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+                    if not ranked:
+                        st.info("No available individuals found for the specified shift.")
+                    else:
+                        st.subheader("Matched Individuals (Manual):")
+                        for ind, score in ranked:
+                            col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
+                            col1.write(f"*Name:* {ind['name']} | *Skills:* {ind['skills']} | *Shift:* {ind['shift']}")
+                            col1.write(f"*Score:* {score:.2f}")
+                            if col2.button("👍", key=f"like_{ind['id']}"):
+                                update_feedback(ind["id"], 0.05)
+                                st.success(f"Feedback recorded for {ind['name']} (+)")
+                            if col3.button("👎", key=f"dislike_{ind['id']}"):
+                                update_feedback(ind["id"], -0.05)
+                                st.warning(f"Feedback recorded for {ind['name']} (-)")
+                            if col4.button(f"Assign Task to {ind['name']}", key=f"assign_{ind['id']}"):
+                                try:
+                                    predicted_time = engine.assign(ind, task_description, due_date, task_urgency,
+                                                                   task_shift)
+                                except AllocationServiceError as e:
+                                    st.error(str(e))
+                                else:
+                                    if predicted_time is not None:
+                                        st.info(f"Task assigned to {ind['name']}!")
+                                        email_msg = simulate_email_notification(ind, task_description, predicted_time)
+                                        st.text_area("Simulated Email Notification", value=email_msg, height=150)
+                                    else:
+                                        st.warning(f"{ind['name']} was just given another task; pick someone else.")
+                        engine.record_match(task_description, task_category.strip(), task_urgency, ranked, due_date)
     with col_auto:
         if st.button("Auto Allocate Task"):
             if not task_description.strip():
                 st.error("Please enter a valid task description.")
             else:
-                candidate, candidate_score, explanation = ai_allocate_task_with_explanation(
-                    task_description, task_urgency, task_shift, [], due_date
-                )
-                if candidate is None:
-                    st.info("No available individuals found for auto allocation in the specified shift.")
+                try:
+                    candidate, candidate_score, explanation, predicted_time = engine.allocate(
+                        task_description, task_urgency, task_shift, due_date
+                    )
+                except AllocationServiceError as e:
+                    st.error(str(e))
                 else:
-                    predicted_time = simulate_task_completion(candidate)
-                    candidate["tasks_assigned"] += 1
-                    candidate["available"] = False
-                    candidate["predicted_completion"] = predicted_time
-                    candidate["current_task"] = task_description
-                    candidate["progress"] = 0
-                    st.success(f"Task auto-allocated to {candidate['name']} with predicted completion in {predicted_time} hrs!")
-                    st.balloons()
-                    st.markdown("### Allocation Breakdown")
-                    st.json(explanation)
-                    email_msg = simulate_email_notification(candidate, task_description, predicted_time)
-                    st.text_area("Simulated Email Notification", value=email_msg, height=150)
-                    st.session_state.match_history.append({
-                        "task": task_description,
-                        "category": task_category if task_category.strip() else classify_task(task_description),
-                        "urgency": task_urgency,
-                        "matches": [(candidate["id"], candidate_score)],
-                        "predicted_completion": predicted_time,
-                        "due_date": due_date.strftime("%Y-%m-%d %H:%M") if due_date else "N/A",
-                        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+                    if candidate is None:
+                        st.info("No available individuals found for auto allocation in the specified shift.")
+                    else:
+                        st.success(f"Task auto-allocated to {candidate['name']} with predicted completion in {predicted_time} hrs!")
+                        st.balloons()
+                        st.markdown("### Allocation Breakdown")
+                        st.json(explanation)
+                        email_msg = simulate_email_notification(candidate, task_description, predicted_time)
+                        st.text_area("Simulated Email Notification", value=email_msg, height=150)
+                        engine.record_match(task_description, task_category.strip(), task_urgency,
+                                            [(candidate, candidate_score)], due_date, predicted_time)
     
     st.subheader("General Feedback on Matching")
     feedback_text = st.text_area("Provide general feedback on the matching results (optional):", key="general_feedback")
     if st.button("Submit General Feedback"):
         if feedback_text.strip():
-            label, score = analyze_feedback_sentiment(feedback_text)
+            label, score = batcher_for(analyze_feedback_sentiment_batch)(feedback_text)
             st.write(f"Feedback Sentiment: {label} with confidence {score:.2f}")
             st.success("General feedback recorded!")
         else:
@@ -186,20 +225,33 @@ with tabs[0]:
 # ---------------------------
 # TAB 2: Manage Availability
 # ---------------------------
-with tabs[1]:
+with tabs[1], span("tab.manage_availability"):
     st.header("Manage Availability")
     st.markdown("**Objective:** Update the availability status for each individual.")
+
+    def toggle_availability(individual_id, expected_version):
+        # Runs only for the checkbox the user clicked; the write is refused if another
+        # session changed that person since this page was drawn.
+        ind = st.session_state.individuals.get(individual_id)
+        if ind is not None and not set_availability(ind, st.session_state[f"avail_{individual_id}"], expected_version):
+            st.session_state.availability_conflict = ind["name"]
+
+    conflict = st.session_state.pop("availability_conflict", None)
+    if conflict:
+        st.warning(f"{conflict} was updated in another session; their availability was reloaded.")
     for ind in st.session_state.individuals:
         col1, col2 = st.columns([3, 1])
         col1.write(f"*Name:* {ind['name']} | *Skills:* {ind['skills']} | *Shift:* {ind['shift']}")
-        new_status = col2.checkbox("Available", value=ind["available"], key=f"avail_{ind['id']}")
-        ind["available"] = new_status
+        # The roster is shared by every session, so each rerun shows its current state.
+        st.session_state[f"avail_{ind['id']}"] = ind["available"]
+        col2.checkbox("Available", key=f"avail_{ind['id']}", on_change=toggle_availability,
+                      args=(ind["id"], ind["version"]))
     st.success("Availability statuses updated.")
 
 # ---------------------------
 # TAB 3: Manage Individuals & CSV Export
 # ---------------------------
-with tabs[2]:
+with tabs[2], span("tab.manage_individuals"):
     st.header("Manage Individuals")
     st.markdown("""
         **Objective:** Add, remove, or search for individuals.
@@ -218,29 +270,50 @@ with tabs[2]:
             else:
                 new_id = add_individual(st.session_state.individuals, name, skills_input, proficiencies_input, available_input, shift)
                 st.session_state.feedback[new_id] = 0.0
+                if embedding_store is not None:
+                    embedding_store.update([st.session_state.individuals.get(new_id)], model)
                 st.success(f"Individual '{name}' added with ID: {new_id}")
-    
+
+    st.markdown("### Bulk Import")
+    roster_file = st.file_uploader("Upload a roster (CSV, JSONL or Parquet) with name, skills, proficiencies, "
+                                   "shift, available and external_id columns", type=["csv", "jsonl", "json", "parquet"])
+    if roster_file is not None and st.button("Import Individuals"):
+        importer = RosterImporter(st.session_state.individuals, get_storage(), st.session_state.feedback,
+                                  embedding_store, model)
+        progress_text = st.empty()
+        report = importer.run(roster_file, detect_format(roster_file.name),
+                              on_chunk=lambda r: progress_text.write(f"{r['rows']} rows read, {r['added']} added"))
+        st.success(f"Imported {report['added']} individuals from {report['rows']} rows "
+                   f"({report['rows_per_sec']} rows/sec); {report['duplicates']} duplicates skipped, "
+                   f"{report['rejected']} rows rejected.")
+        if report["rejects"]:
+            st.json(report["rejects"])
+
     st.markdown("### Search Individuals")
     search_term = st.text_input("Search by name or skill")
     filtered_inds = st.session_state.individuals
     if search_term:
-        filtered_inds = [ind for ind in st.session_state.individuals if search_term.lower() in ind["name"].lower() or search_term.lower() in ind["skills"].lower()]
+        filtered_inds = st.session_state.individuals.search(search_term)
     st.markdown("### Current Individuals")
     for ind in filtered_inds:
         st.write(f"*Name:* {ind['name']} | *Skills:* {ind['skills']} | *Shift:* {ind['shift']} | *Available:* {ind['available']}")
     
-    df_inds = pd.DataFrame(st.session_state.individuals)
-    csv_inds = df_inds.to_csv(index=False).encode('utf-8')
-    st.download_button("Export Individuals as CSV", data=csv_inds, file_name="individuals.csv", mime="text/csv")
+    if st.button("Prepare Individuals Export"):
+        csv_inds = records_csv(st.session_state.individuals.to_records(), list(FIELDS))
+        st.download_button("Export Individuals as CSV", data=csv_inds, file_name="individuals.csv", mime="text/csv")
 
 # ---------------------------
 # TAB 4: Match History & CSV Export
 # ---------------------------
-with tabs[3]:
+with tabs[3], span("tab.match_history"):
     st.header("Match History")
     st.markdown("**Objective:** Review past task matching events.")
-    if st.session_state.match_history:
-        for idx, record in enumerate(reversed(st.session_state.match_history), start=1):
+    history = st.session_state.match_history
+    total_matches = len(history)
+    if total_matches:
+        page_count = (total_matches - 1) // HISTORY_PAGE_SIZE + 1
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1) - 1
+        for idx, record in enumerate(history.page(page, HISTORY_PAGE_SIZE), start=page * HISTORY_PAGE_SIZE + 1):
             st.markdown(f"*Match {idx}:*")
             st.write(f"Task: {record['task']}")
             st.write(f"Category: {record['category']} | Urgency: {record['urgency']} | Due Date: {record['due_date']} | Timestamp: {record['timestamp']}")
@@ -249,50 +322,76 @@ with tabs[3]:
             for match in record['matches']:
                 st.write(f"- User ID: {match[0]} | Score: {match[1]:.2f}")
             st.markdown("---")
-        df_history = pd.DataFrame(st.session_state.match_history)
-        csv_history = df_history.to_csv(index=False).encode('utf-8')
-        st.download_button("Export Match History as CSV", data=csv_history, file_name="match_history.csv", mime="text/csv")
+        export_format = st.selectbox("Export format", ["CSV", "Parquet"])
+        if st.button("Prepare Match History Export"):
+            # Each export goes to its own temporary directory, so concurrent sessions
+            # never share a file; it is removed once the download data is registered.
+            with tempfile.TemporaryDirectory() as export_dir:
+                if export_format == "CSV":
+                    export_path = history.export_csv(os.path.join(export_dir, "match_history.csv"))
+                    mime = "text/csv"
+                else:
+                    export_path = history.export_parquet(os.path.join(export_dir, "match_history.parquet"))
+                    mime = "application/octet-stream"
+                with open(export_path, "rb") as export_file:
+                    st.download_button(f"Export Match History as {export_format}", data=export_file,
+                                       file_name=os.path.basename(export_path), mime=mime)
     else:
         st.info("No match history available yet.")
 
 # ---------------------------
 # TAB 5: Performance Analytics
 # ---------------------------
-with tabs[4]:
+with tabs[4], span("tab.performance_analytics"):
     st.header("Performance Analytics")
     st.markdown("**Objective:** View aggregated performance data and feedback trends.")
-    df = pd.DataFrame(st.session_state.individuals)
-    if not df.empty:
-        df["predicted_completion"] = df["predicted_completion"].fillna("N/A")
-        df_display = df[["name", "skills", "shift", "available", "tasks_assigned", "tasks_completed", "avg_feedback", "predicted_completion"]]
-        st.dataframe(df_display)
-        chart_data = df[["name", "tasks_assigned"]]
-        chart = alt.Chart(chart_data).mark_bar().encode(
+    analytics = st.session_state.analytics
+    if len(analytics):
+        pd = lazy_import("pandas")
+        alt = lazy_import("altair")
+        summary = analytics.summary()
+        col_people, col_available, col_assigned, col_feedback = st.columns(4)
+        col_people.metric("Individuals", summary["individuals"])
+        col_available.metric("Available", summary["available"])
+        col_assigned.metric("Tasks Assigned", summary["tasks_assigned"])
+        col_feedback.metric("Avg Feedback", summary["avg_feedback"])
+        page_count = (len(analytics) - 1) // ANALYTICS_PAGE_SIZE + 1
+        page = st.number_input(f"Analytics page (of {page_count})", min_value=1, max_value=page_count, value=1,
+                               step=1) - 1
+        st.dataframe(pd.DataFrame(analytics.page(page, ANALYTICS_PAGE_SIZE), columns=ANALYTICS_COLUMNS))
+        chart = alt.Chart(pd.DataFrame(analytics.chart_data())).mark_bar().encode(
             x=alt.X("name", sort=None),
             y="tasks_assigned"
-        ).properties(title="Tasks Assigned by Individual")
+        ).properties(title=f"Tasks Assigned by Individual (top {CHART_SIZE})")
         st.altair_chart(chart, use_container_width=True)
-        csv_perf = df_display.to_csv(index=False).encode('utf-8')
-        st.download_button("Export Performance Analytics as CSV", data=csv_perf, file_name="performance_analytics.csv", mime="text/csv")
+        if st.button("Prepare Performance Analytics Export"):
+            st.download_button("Export Performance Analytics as CSV", data=analytics.export_csv(),
+                               file_name="performance_analytics.csv", mime="text/csv")
     else:
         st.info("No performance data available yet.")
 
 # ---------------------------
 # TAB 6: Team Suggestions & Auto Feedback
 # ---------------------------
-with tabs[5]:
+with tabs[5], span("tab.team_suggestions"):
     st.header("Team Suggestions")
     st.markdown("**Objective:** Get training or improvement suggestions for each team member based on performance.")
+    pending_insights = st.session_state.team_insights.pending()
+    if pending_insights:
+        st.caption(f"Updating suggestions for {pending_insights} team member(s) in the background...")
     for ind in st.session_state.individuals:
         st.markdown(f"### {ind['name']}")
-        suggestions = generate_team_suggestions(ind)
-        for suggestion in suggestions:
+        insights = st.session_state.team_insights.get(ind["id"])
+        if insights is None:
+            st.write("Suggestions are being prepared.")
+            st.markdown("---")
+            continue
+        for suggestion in insights["suggestions"]:
             st.write(f"- {suggestion}")
-        auto_fb = auto_feedback_generator(ind)
         st.markdown("*AI-Generated Feedback:*")
-        st.write(auto_fb)
-        pred_tasks = predict_future_tasks(ind)
-        shift_sugg = suggest_optimal_shift(ind)
+        st.write(insights["auto_feedback"])
+        pred_tasks = insights["predicted_tasks"]
+        shift_sugg = insights["shift_suggestion"]
         st.write(f"*Predicted Tasks Next Week:* {pred_tasks}")
         st.write(f"*Shift Suggestion:* {shift_sugg}")
         st.markdown("---")
@@ -300,7 +399,7 @@ with tabs[5]:
 # ---------------------------
 # TAB 7: Chat with AI Agent
 # ---------------------------
-with tabs[6]:
+with tabs[6], span("tab.chat"):
     st.header("Chat with AI Agent")
     st.markdown("**Objective:** Interact with the AI agent. Ask questions or provide feedback.")
     if st.session_state.chat_history:
@@ -311,7 +410,7 @@ with tabs[6]:
     user_message = st.text_input("Your message to the AI Agent", key="chat_input")
     if st.button("Send Message"):
         if user_message.strip():
-            ai_reply = get_ai_response(user_message)
+            ai_reply = batcher_for(get_ai_response_batch)(user_message)
             st.session_state.chat_history.append({"user": user_message, "ai": ai_reply})
         else:
             st.error("Please enter a message to send.")
@@ -320,42 +419,56 @@ with tabs[6]:
 # ---------------------------
 # TAB 8: Task Monitoring & Progress Update
 # ---------------------------
-with tabs[7]:
+with tabs[7], span("tab.task_monitoring"):
     st.header("Task Monitoring")
     st.markdown("**Objective:** View active tasks with progress. Update progress or reassign overdue tasks.")
-    for ind in st.session_state.individuals:
-                if ind["current_task"] is not None and "progress" not in ind:
-                   ind["progress"] = 0
-    active_tasks = [ind for ind in st.session_state.individuals if ind["current_task"] is not None]
+    tracker = get_progress_tracker()
+    active_tasks = st.session_state.individuals.active()
     if active_tasks:
         for ind in active_tasks:
             st.markdown(f"### {ind['name']} ({ind['shift']})")
             st.write(f"*Current Task:* {ind['current_task']}")
             st.write(f"*Predicted Completion:* {ind['predicted_completion']} hrs")
+            tracked = tracker.get(ind["id"])
+            if tracked and tracked["deadline"]:
+                st.write(f"*Deadline:* {tracked['deadline'].strftime('%Y-%m-%d %H:%M')}")
             st.progress(ind["progress"] / 100.0)
             st.markdown("---")
+        with st.form("report_progress_form"):
+            names = {f"{ind['name']} ({ind['id']})": ind["id"] for ind in active_tasks}
+            reported_ind = st.selectbox("Individual", list(names))
+            reported_progress = st.slider("Progress (%)", min_value=0, max_value=100, value=50)
+            if st.form_submit_button("Report Progress"):
+                tracker.report(names[reported_ind], reported_progress)
+                st.success("Progress reported; it will be applied on the next update.")
         col_update, col_reassign = st.columns(2)
         with col_update:
             if st.button("Update Task Progress"):
-                update_progress_for_all_tasks()
+                completed = update_progress_for_all_tasks()
                 st.success("Progress updated!")
+                if completed:
+                    st.info(f"Completed tasks: {len(completed)}")
         with col_reassign:
             if st.button("Reassign Overdue Tasks"):
-                reassign_overdue_tasks()
+                reassignments = reassign_overdue_tasks(embedding_store=embedding_store)
+                if reassignments:
+                    st.json(reassignments)
+                else:
+                    st.info("No overdue tasks.")
     else:
         st.info("No active tasks at the moment.")
 
 # ---------------------------
 # TAB 9: Advanced AI Features (Task Decomposition)
 # ---------------------------
-with tabs[8]:
+with tabs[8], span("tab.advanced_ai"):
     st.header("Advanced AI Features")
     st.markdown("**Objective:** Leverage advanced AI functions for enhanced task management.")
     st.subheader("Task Decomposition")
     complex_task = st.text_area("Enter a complex task to decompose into subtasks", placeholder="E.g., Develop a full-stack e-commerce application with payment integration, user authentication, and admin dashboard.")
     if st.button("Decompose Task"):
         if complex_task.strip():
-            subtasks = decompose_task(complex_task)
+            subtasks = batcher_for(decompose_task_batch)(complex_task)
             st.markdown("*Subtasks Generated:*")
             st.write(subtasks)
         else:
@@ -364,7 +477,7 @@ with tabs[8]:
 # ---------------------------
 # TAB 10: Job Scheduling & Proposals
 # ---------------------------
-with tabs[9]:
+with tabs[9], span("tab.job_scheduling"):
     st.header("Job Scheduling & Proposals")
     st.markdown("**Objective:** Schedule new jobs (with required qualifications and due dates) and allow team members to submit proposals.")
     st.subheader("Schedule a New Job")
@@ -391,7 +504,7 @@ with tabs[9]:
                     "due_date": job_due_date,
                     "assigned": False
                 }
-                schedule_job(job)
+                schedule_job(job, job_scheduler)
             except Exception as e:
                 st.error(f"Error in scheduling job: {e}")
     
@@ -404,7 +517,10 @@ with tabs[9]:
         prop_submitted = st.form_submit_button("Submit Proposal")
         if prop_submitted:
             if prop_job_id.strip() and proposer_name.strip() and proposal_text.strip():
-                submit_proposal(prop_job_id, proposer_name, proposal_text, estimated_time)
+                try:
+                    submit_proposal(prop_job_id.strip(), proposer_name, proposal_text, estimated_time, proposal_index)
+                except ValueError as e:
+                    st.error(str(e))
             else:
                 st.error("Please fill in all proposal details.")
     
@@ -419,15 +535,71 @@ with tabs[9]:
             st.write(f"Due Date: {job['due_date'].strftime('%Y-%m-%d %H:%M') if job.get('due_date') else 'N/A'}")
             st.write(f"Assigned: {'Yes' if job.get('assigned') else 'No'}")
             st.markdown("---")
+        if st.button("Allocate Pending Jobs"):
+            decisions = allocate_pending_jobs(st.session_state.job_schedule, st.session_state.individuals.free(), model,
+                                              st.session_state.feedback, embedding_store)
+            if decisions:
+                st.markdown("### Allocation Breakdown")
+                st.json(decisions)
+            else:
+                st.info("All scheduled jobs are already assigned.")
     else:
         st.info("No scheduled jobs yet.")
     
     st.subheader("Current Proposals")
-    if st.session_state.proposals:
-        for prop in st.session_state.proposals:
-            st.markdown(f"**Job ID:** {prop['job_id']} | **Proposer:** {prop['proposer']}")
+    proposal_jobs = proposal_index.job_ids()
+    if proposal_jobs:
+        selected_job = st.selectbox("Job", proposal_jobs, key="proposal_job")
+        st.caption(f"Top {TOP_PROPOSALS} of {proposal_index.count(selected_job)} proposals, ranked by relevance "
+                   f"to the job, proposer feedback and estimated time.")
+        for prop, breakdown in proposal_index.top(selected_job, TOP_PROPOSALS):
+            st.markdown(f"**Proposer:** {prop['proposer']} | **Score:** {breakdown['score']}")
             st.write(f"Proposal: {prop['proposal_text']}")
             st.write(f"Estimated Time: {prop['estimated_time']} hrs | Submitted at: {prop['timestamp']}")
+            st.json(breakdown, expanded=False)
             st.markdown("---")
     else:
-        st.info("No proposals submitted yet.")
\ No newline at end of file
+        st.info("No proposals submitted yet.")
+
+# ---------------------------
+# TAB 11: Admin - Tracing and Profiling
+# ---------------------------
+with tabs[10]:
+    st.header("Admin")
+    st.markdown("**Objective:** See where rerun time goes and export the metrics.")
+    tracing.register_stats("timings", timing_report)
+    tracing.register_stats("job_scheduler", job_scheduler.stats)
+    tracing.register_stats("team_insights", lambda: {"computed": st.session_state.team_insights.computed,
+                                                     "pending": st.session_state.team_insights.pending()})
+    tracing_on = st.checkbox("Enable tracing", value=tracing.enabled())
+    if tracing_on != tracing.enabled():
+        tracing.set_enabled(tracing_on)
+    if st.button("Reset Metrics"):
+        tracing.reset()
+    metrics = tracing.report()
+    if metrics["spans"]:
+        pd = lazy_import("pandas")
+        df_spans = pd.DataFrame.from_dict(metrics["spans"], orient="index").sort_values("total_s", ascending=False)
+        st.dataframe(df_spans)
+    else:
+        st.info("No traced calls yet. Enable tracing and use the app to collect timings.")
+    st.subheader("Cache and Queue Statistics")
+    st.json(metrics["stats"])
+    col_prom, col_json = st.columns(2)
+    col_prom.download_button("Export Prometheus Metrics", data=tracing.prometheus_text(),
+                             file_name="task_alloc_metrics.prom", mime="text/plain")
+    col_json.download_button("Export Metrics as JSON", data=tracing.export_json(),
+                             file_name="task_alloc_metrics.json", mime="application/json")
+
+# Commit any writes buffered during this rerun.
+get_storage().flush()
+
+record_rerun(rerun_started)
+with st.sidebar.expander("Performance Timings"):
+    st.json(timing_report())
+with st.sidebar.expander("Task Feature Cache"):
+    st.json(task_feature_cache.stats())
+with st.sidebar.expander("Inference Batching"):
+    st.json(batcher_stats())
+with st.sidebar.expander("Job Scheduler"):
+    st.json(job_scheduler.stats())
@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from tracing import register_stats
+
+
+class MicroBatcher:
+    # Groups single-item requests from concurrent callers into one call to a batch
+    # function. A batch is dispatched once max_batch_size items are waiting or
+    # max_latency seconds after its first item arrived, whichever comes first. If the
+    # batch call raises, each item is retried on its own so one bad item only fails
+    # its own caller. A batch function must return one result per item; a call that
+    # returns a different number counts as failed, so no caller is left waiting.
+    def __init__(self, batch_fn, max_batch_size=32, max_latency=0.01):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=f"batcher-{batch_fn.__name__}", daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def map(self, items, timeout=None):
+        futures = [self.submit(item) for item in items]
+        return [future.result(timeout) for future in futures]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            pending = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            items = [item for item, _ in pending]
+            futures = [future for _, future in pending]
+            try:
+                results = self._call(items)
+            except Exception as exc:
+                if len(items) == 1:
+                    futures[0].set_exception(exc)
+                else:
+                    self._run_singly(items, futures)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def _call(self, items):
+        results = list(self.batch_fn(items))
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.batch_fn.__name__} returned {len(results)} results for {len(items)} items")
+        return results
+
+    def _run_singly(self, items, futures):
+        for item, future in zip(items, futures):
+            try:
+                result, = self._call([item])
+            except Exception as exc:
+                future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += 1
+            future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "queued": self._queue.qsize(),
+        }
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def batcher_for(batch_fn, **kwargs):
+    # Process-wide batcher per batch function, so concurrent sessions share batches.
+    with _batchers_lock:
+        batcher = _batchers.get(batch_fn)
+        if batcher is None:
+            batcher = _batchers[batch_fn] = MicroBatcher(batch_fn, **kwargs)
+        return batcher
+
+
+def batcher_stats():
+    with _batchers_lock:
+        return {fn.__name__: batcher.stats() for fn, batcher in _batchers.items()}
+
+
+register_stats("batching", batcher_stats)
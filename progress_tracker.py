@@ -0,0 +1,135 @@
+import collections
+import datetime
+import heapq
+import itertools
+import threading
+
+from roster import record_lock
+
+
+class ProgressTracker:
+    # Active assignments indexed by deadline. A deadline is the earlier of the task's
+    # due date and assignment time + predicted_completion hours. Progress arrives as
+    # events that are applied in order. Overdue detection pops expired heap entries
+    # instead of scanning the roster; entries left behind by completed or reassigned
+    # tasks are skipped by version.
+    def __init__(self, clock=datetime.datetime.now):
+        self.clock = clock
+        self._heap = []
+        self._active = {}
+        self._events = collections.deque()
+        self._versions = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._active)
+
+    def track(self, individual, task, due_date=None, urgency="Medium", task_shift="Any"):
+        now = self.clock()
+        deadline = None
+        if individual["predicted_completion"] is not None:
+            deadline = now + datetime.timedelta(hours=float(individual["predicted_completion"]))
+        if due_date is not None and (deadline is None or due_date < deadline):
+            deadline = due_date
+        entry = {
+            "individual_id": individual["id"],
+            "task": task,
+            "assigned_at": now,
+            "deadline": deadline,
+            "due_date": due_date,
+            "urgency": urgency,
+            "task_shift": task_shift,
+            "version": next(self._versions),
+        }
+        with self._lock:
+            self._active[individual["id"]] = entry
+            if deadline is not None:
+                heapq.heappush(self._heap, (deadline, entry["version"], individual["id"]))
+        return entry
+
+    def restore(self, entry):
+        # Puts back an entry returned by pop_overdue, keeping its original deadline.
+        with self._lock:
+            if entry["individual_id"] in self._active:
+                return
+            self._active[entry["individual_id"]] = entry
+            heapq.heappush(self._heap, (entry["deadline"], entry["version"], entry["individual_id"]))
+
+    def untrack(self, individual_id):
+        with self._lock:
+            return self._active.pop(individual_id, None)
+
+    def get(self, individual_id):
+        return self._active.get(individual_id)
+
+    def report(self, individual_id, progress):
+        # Queues a progress event (0-100) for an individual's current task.
+        self._events.append((individual_id, max(0, min(100, int(progress)))))
+
+    def estimate_progress(self):
+        # Queues time-based progress events for tracked tasks that have a deadline.
+        now = self.clock()
+        with self._lock:
+            entries = list(self._active.values())
+        for entry in entries:
+            if entry["deadline"] is None:
+                continue
+            total = (entry["deadline"] - entry["assigned_at"]).total_seconds()
+            elapsed = (now - entry["assigned_at"]).total_seconds()
+            if total > 0:
+                self.report(entry["individual_id"], min(99, 100 * elapsed / total))
+
+    def apply_events(self, roster):
+        # Applies queued progress events to the roster. Returns the ids of individuals
+        # whose task reached 100% and was completed.
+        completed = []
+        while self._events:
+            individual_id, progress = self._events.popleft()
+            individual = roster.get(individual_id)
+            entry = self._active.get(individual_id)
+            if individual is None or entry is None:
+                continue
+            with record_lock(individual_id):
+                if individual["current_task"] != entry["task"] or progress < individual["progress"]:
+                    continue
+                individual["progress"] = progress
+                if progress >= 100:
+                    if complete_task(individual):
+                        completed.append(individual_id)
+                    self.untrack(individual_id)
+        return completed
+
+    def pop_overdue(self):
+        # Removes and returns every tracked assignment whose deadline has passed.
+        now = self.clock()
+        overdue = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, version, individual_id = heapq.heappop(self._heap)
+                entry = self._active.get(individual_id)
+                if entry is None or entry["version"] != version:
+                    continue
+                del self._active[individual_id]
+                overdue.append(entry)
+        return overdue
+
+    def next_deadline(self):
+        with self._lock:
+            while self._heap:
+                _, version, individual_id = self._heap[0]
+                entry = self._active.get(individual_id)
+                if entry is not None and entry["version"] == version:
+                    return entry["deadline"]
+                heapq.heappop(self._heap)
+        return None
+
+
+def complete_task(individual):
+    # Callers hold record_lock for the individual. Returns False when another process
+    # changed the stored record first.
+    return individual.compare_and_set({
+        "tasks_completed": individual["tasks_completed"] + 1,
+        "current_task": None,
+        "predicted_completion": None,
+        "available": True,
+    }, individual["version"])
@@ -0,0 +1,152 @@
+import bisect
+import itertools
+import threading
+
+import numpy as np
+
+from feature_cache import task_feature_cache
+from roster import normalize_name
+
+# Proposal ranking: cosine similarity of the proposal text to the job description,
+# the proposer's average feedback out of 5, and a shorter-estimate bonus that falls
+# to half at TIME_SCALE_HOURS.
+SIMILARITY_WEIGHT = 1.0
+FEEDBACK_WEIGHT = 0.5
+TIME_WEIGHT = 0.5
+TIME_SCALE_HOURS = 8.0
+
+
+def cosine(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+
+class ProposalIndex:
+    # Proposals grouped by job, each job's kept sorted by score with bisect so the
+    # best N come back without scanning. Job ids are checked against the job schedule
+    # on insert. The similarity is computed once and stored on the proposal record;
+    # the feedback part is refreshed when the proposer's record changes, which moves
+    # their proposals within each job.
+    def __init__(self, proposals, job_schedule, individuals, model):
+        self.proposals = proposals
+        self.job_schedule = job_schedule
+        self.individuals = individuals
+        self.model = model
+        self._jobs = {}
+        self._job_count = 0
+        self._ranked = {}
+        self._entries = {}
+        self._by_proposer = {}
+        self._seq = itertools.count()
+        self._loaded = False
+        self._lock = threading.RLock()
+        individuals.subscribe(self._proposer_changed)
+
+    def job(self, job_id):
+        # Jobs are only rescanned when the schedule has grown since the last lookup.
+        with self._lock:
+            if job_id not in self._jobs and len(self.job_schedule) != self._job_count:
+                self._jobs = {job["job_id"]: job for job in self.job_schedule}
+                self._job_count = len(self._jobs)
+            return self._jobs.get(job_id)
+
+    def _proposer(self, name):
+        name_key = normalize_name(name)
+        words = name_key.split()
+        if not words:
+            return None
+        for ind in self.individuals.search(words[0]):
+            if normalize_name(ind["name"]) == name_key:
+                return ind
+        return None
+
+    def _feedback_part(self, name):
+        proposer = self._proposer(name)
+        return FEEDBACK_WEIGHT * (proposer["avg_feedback"] / 5 if proposer is not None else 0.0)
+
+    def _similarities(self, proposals):
+        jobs = [self.job(p["job_id"]) for p in proposals]
+        known = [row for row, job in enumerate(jobs) if job is not None]
+        similarities = [0.0] * len(proposals)
+        if known:
+            job_embeddings = task_feature_cache.embeddings([jobs[row]["task_description"] for row in known], self.model)
+            text_embeddings = self.model.encode([proposals[row]["proposal_text"] for row in known])
+            for row, job_embedding, text_embedding in zip(known, job_embeddings, text_embeddings):
+                similarities[row] = round(cosine(job_embedding, text_embedding), 4)
+        return similarities
+
+    def _insert(self, proposal):
+        entry = {
+            "proposal": proposal,
+            "seq": next(self._seq),
+            "feedback": self._feedback_part(proposal["proposer"]),
+            "time": TIME_WEIGHT / (1 + float(proposal["estimated_time"]) / TIME_SCALE_HOURS),
+        }
+        entry["score"] = SIMILARITY_WEIGHT * proposal["similarity"] + entry["feedback"] + entry["time"]
+        bisect.insort(self._ranked.setdefault(proposal["job_id"], []), (-entry["score"], entry["seq"]))
+        self._entries[entry["seq"]] = entry
+        self._by_proposer.setdefault(normalize_name(proposal["proposer"]), []).append(entry)
+
+    def _load(self):
+        # Proposals saved before the index existed get their similarity in one batch.
+        if self._loaded:
+            return
+        self._loaded = True
+        existing = list(self.proposals)
+        missing = [p for p in existing if "similarity" not in p]
+        for proposal, similarity in zip(missing, self._similarities(missing)):
+            proposal["similarity"] = similarity
+        for proposal in existing:
+            self._insert(proposal)
+
+    def add(self, proposal):
+        # Scores and indexes a proposal; raises ValueError for an unknown job id.
+        with self._lock:
+            if self.job(proposal["job_id"]) is None:
+                raise ValueError(f"Unknown job id: {proposal['job_id']}")
+            self._load()
+            proposal["similarity"] = self._similarities([proposal])[0]
+            self._insert(proposal)
+            return proposal
+
+    def _proposer_changed(self, individual):
+        with self._lock:
+            entries = self._by_proposer.get(normalize_name(individual["name"]))
+            if not entries:
+                return
+            feedback = FEEDBACK_WEIGHT * individual["avg_feedback"] / 5
+            for entry in entries:
+                if entry["feedback"] == feedback:
+                    continue
+                ranked = self._ranked[entry["proposal"]["job_id"]]
+                del ranked[bisect.bisect_left(ranked, (-entry["score"], entry["seq"]))]
+                entry["score"] += feedback - entry["feedback"]
+                entry["feedback"] = feedback
+                bisect.insort(ranked, (-entry["score"], entry["seq"]))
+
+    def job_ids(self):
+        with self._lock:
+            self._load()
+            return list(self._ranked)
+
+    def count(self, job_id):
+        with self._lock:
+            self._load()
+            return len(self._ranked.get(job_id, ()))
+
+    def top(self, job_id, n=5):
+        # The n best proposals for a job as (proposal, score breakdown), best first.
+        with self._lock:
+            self._load()
+            results = []
+            for _, seq in self._ranked.get(job_id, [])[:n]:
+                entry = self._entries[seq]
+                results.append((entry["proposal"], {
+                    "similarity": entry["proposal"]["similarity"],
+                    "feedback": round(entry["feedback"], 4),
+                    "estimated_time": round(entry["time"], 4),
+                    "score": round(entry["score"], 4),
+                }))
+            return results
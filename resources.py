@@ -0,0 +1,95 @@
+import collections
+import importlib
+import os
+import threading
+import time
+
+from tracing import enabled as tracing_enabled, record, span
+
+MODEL_NAME = os.environ.get("TASK_ALLOC_MODEL", "all-MiniLM-L6-v2")
+
+PROCESS_STARTED = time.perf_counter()
+
+_model = None
+_model_lock = threading.Lock()
+_warm_thread = None
+_timings = {"model_load": None, "imports": {}, "cold_start": None}
+_reruns = collections.deque(maxlen=500)
+
+
+def get_model():
+    # Loads the sentence encoder once per process; later calls return the same instance.
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(MODEL_NAME)
+                model.encode(["warm up"])
+                _timings["model_load"] = time.perf_counter() - started
+                _model = model
+    return _model
+
+
+def model_ready():
+    return _model is not None
+
+
+def warm_up():
+    # Starts loading the encoder in a background thread so the first match does not
+    # pay for it. Safe to call on every rerun.
+    global _warm_thread
+    if _warm_thread is None:
+        with _model_lock:
+            if _warm_thread is None:
+                _warm_thread = threading.Thread(target=get_model, name="model-warm-up", daemon=True)
+                _warm_thread.start()
+
+
+class SharedModel:
+    # Stand-in for the encoder that defers loading until encode is first called.
+    def encode(self, sentences, **kwargs):
+        encoder = get_model()
+        with span("model.encode"):
+            return encoder.encode(sentences, **kwargs)
+
+
+model = SharedModel()
+
+
+def lazy_import(name):
+    # Imports a heavy module on first use and records how long the import took.
+    if name not in _timings["imports"]:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        _timings["imports"][name] = time.perf_counter() - started
+        return module
+    return importlib.import_module(name)
+
+
+def record_rerun(started):
+    elapsed = time.perf_counter() - started
+    if _timings["cold_start"] is None:
+        _timings["cold_start"] = time.perf_counter() - PROCESS_STARTED
+    _reruns.append(elapsed)
+    if tracing_enabled():
+        record("app.rerun", elapsed)
+    return elapsed
+
+
+def timing_report():
+    reruns = sorted(_reruns)
+    report = {
+        "cold_start_s": _timings["cold_start"],
+        "model_load_s": _timings["model_load"],
+        "model_ready": model_ready(),
+        "imports_s": dict(_timings["imports"]),
+        "reruns": len(reruns),
+    }
+    if reruns:
+        report["last_rerun_s"] = _reruns[-1]
+        report["p50_rerun_s"] = reruns[len(reruns) // 2]
+        report["p95_rerun_s"] = reruns[min(len(reruns) - 1, int(len(reruns) * 0.95))]
+        report["max_rerun_s"] = reruns[-1]
+    return report
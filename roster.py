@@ -0,0 +1,237 @@
+import bisect
+import threading
+
+FIELDS = ("id", "name", "skills", "proficiencies", "available", "shift", "tasks_assigned",
+          "tasks_completed", "avg_feedback", "predicted_completion", "current_task", "progress", "version")
+DEFAULTS = {"available": True, "tasks_assigned": 0, "tasks_completed": 0, "avg_feedback": 0.0, "progress": 0,
+            "version": 0}
+INDEXED_FIELDS = ("name", "skills", "shift", "available", "current_task")
+LOCK_STRIPES = 64
+
+_record_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def record_lock(individual_id):
+    # Striped lock serialising assignment changes to one individual. Records share
+    # a fixed pool of locks, so a large roster does not need a lock per person.
+    return _record_locks[hash(individual_id) % LOCK_STRIPES]
+
+
+def normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+
+def search_tokens(name, skills):
+    tokens = set(name.lower().split())
+    for skill in skills.lower().split(","):
+        skill = skill.strip()
+        if skill:
+            tokens.add(skill)
+            tokens.update(skill.split())
+    return tokens
+
+
+class Individual:
+    # Compact record with the same keys as the dicts built by add_individual. Supports
+    # dict-style access so tab code can keep using ind["field"]; writes to indexed
+    # fields keep the owning roster's indexes up to date. Writing the value a field
+    # already holds is a no-op, so it is not persisted or passed to listeners.
+    __slots__ = FIELDS + ("_roster", "_pos", "_extra")
+
+    def __init__(self, data):
+        for field in FIELDS:
+            setattr(self, field, data.get(field, DEFAULTS.get(field)))
+        self._roster = None
+        self._pos = -1
+        self._extra = None
+        for key, value in data.items():
+            if key not in FIELDS:
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self and self[key] == value:
+            return
+        if key not in FIELDS:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            if self._roster is not None:
+                self._roster._changed(self)
+            return
+        if self._roster is not None and key in INDEXED_FIELDS:
+            with self._roster._lock:
+                self._roster._unindex(self)
+                setattr(self, key, value)
+                self._roster._index(self)
+        else:
+            setattr(self, key, value)
+        if self._roster is not None:
+            self._roster._changed(self)
+
+    def compare_and_set(self, changes, expected_version):
+        # Applies changes and bumps the version if the record is still at
+        # expected_version. When the roster is persisted, the new record is written with
+        # compare_and_put first, so of several processes sharing the storage only one
+        # can move a record past a given version. Callers hold record_lock.
+        # Returns whether the changes were applied.
+        if self.version != expected_version:
+            return False
+        changes = dict(version=expected_version + 1, **changes)
+        storage = self._roster.storage if self._roster is not None else None
+        if storage is not None and not storage.compare_and_put(
+                "individuals", self.id, dict(self.to_dict(), **changes), expected_version):
+            return False
+        for key, value in changes.items():
+            self[key] = value
+        return True
+
+    def __contains__(self, key):
+        return key in FIELDS or (self._extra is not None and key in self._extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(FIELDS) + list(self._extra or ())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Individual({self.to_dict()!r})"
+
+
+class Roster:
+    # Ordered collection of Individual records with hash indexes on id, shift and
+    # availability plus an inverted index from skill/name tokens to ids, so the
+    # availability filter, active-task scan and search avoid walking every record.
+    # on_change, when set, is called with every record that is added or modified.
+    # Index updates and lookups hold a lock so records can change on other threads.
+    # Functions passed to subscribe() are called after on_change. version counts
+    # changes so derived data can tell whether it is still current. storage, when set,
+    # is the backend the "individuals" collection is persisted to.
+    def __init__(self, individuals=(), on_change=None, storage=None):
+        self.version = 0
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._records = []
+        self._by_id = {}
+        self._by_shift = {}
+        self._available = set()
+        self._active = set()
+        self._free_by_shift = {}
+        self._by_token = {}
+        self._sorted_tokens = []
+        self.on_change = None
+        for individual in individuals:
+            self.append(individual)
+        self.on_change = on_change
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, position):
+        return self._records[position]
+
+    def append(self, individual):
+        if not isinstance(individual, Individual):
+            individual = Individual(individual)
+        with self._lock:
+            if individual.id in self._by_id:
+                raise ValueError(f"Duplicate individual id: {individual.id}")
+            individual._roster = self
+            individual._pos = len(self._records)
+            self._records.append(individual)
+            self._by_id[individual.id] = individual
+            self._index(individual)
+        self._changed(individual)
+        return individual
+
+    def _changed(self, individual):
+        self.version += 1
+        if self.on_change is not None:
+            self.on_change(individual)
+        for listener in self._listeners:
+            listener(individual)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def get(self, individual_id):
+        return self._by_id.get(individual_id)
+
+    def _index(self, individual):
+        self._by_shift.setdefault(individual.shift, set()).add(individual.id)
+        if individual.available:
+            self._available.add(individual.id)
+        if individual.current_task is not None:
+            self._active.add(individual.id)
+        elif individual.available:
+            self._free_by_shift.setdefault(individual.shift, set()).add(individual.id)
+        for token in search_tokens(individual.name or "", individual.skills or ""):
+            ids = self._by_token.get(token)
+            if ids is None:
+                ids = self._by_token[token] = set()
+                bisect.insort(self._sorted_tokens, token)
+            ids.add(individual.id)
+
+    def _unindex(self, individual):
+        self._by_shift.get(individual.shift, set()).discard(individual.id)
+        self._available.discard(individual.id)
+        self._active.discard(individual.id)
+        self._free_by_shift.get(individual.shift, set()).discard(individual.id)
+        for token in search_tokens(individual.name or "", individual.skills or ""):
+            self._by_token.get(token, set()).discard(individual.id)
+
+    def _ordered(self, ids):
+        with self._lock:
+            records = [self._by_id[i] for i in ids]
+        return sorted(records, key=lambda ind: ind._pos)
+
+    def by_shift(self, shift):
+        with self._lock:
+            return self._ordered(self._by_shift.get(shift, ()))
+
+    def free(self, shift="Any"):
+        # Available individuals with no current task, optionally restricted to a shift.
+        with self._lock:
+            if shift != "Any":
+                return self._ordered(self._free_by_shift.get(shift, ()))
+            return self._ordered(i for ids in self._free_by_shift.values() for i in ids)
+
+    def active(self):
+        with self._lock:
+            return self._ordered(self._active)
+
+    def search(self, term):
+        # Matches records with a name word or skill starting with the search term.
+        term = term.strip().lower()
+        if not term:
+            return list(self._records)
+        ids = set()
+        with self._lock:
+            position = bisect.bisect_left(self._sorted_tokens, term)
+            while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(term):
+                ids |= self._by_token[self._sorted_tokens[position]]
+                position += 1
+        return self._ordered(ids)
+
+    def to_records(self):
+        return [individual.to_dict() for individual in self._records]
@@ -0,0 +1,196 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import threading
+
+URGENCY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+FAR_FUTURE = float("inf")
+
+
+class SystemClock:
+    def now(self):
+        return datetime.datetime.now()
+
+
+class SimulatedClock:
+    # Clock that only moves when told to; used to drive the scheduler in tests and
+    # benchmarks without waiting in real time.
+    def __init__(self, start=None):
+        self._now = start or datetime.datetime(2025, 1, 1, 9, 0)
+
+    def now(self):
+        return self._now
+
+    def set(self, moment):
+        self._now = max(self._now, moment)
+
+    def advance(self, **delta):
+        self._now += datetime.timedelta(**delta)
+
+
+def job_priority(job):
+    # Order among jobs that are already due: nearest due date first, then urgency,
+    # then the earliest scheduled time.
+    due = job.get("due_date")
+    return (
+        due.timestamp() if due else FAR_FUTURE,
+        URGENCY_RANK.get(job.get("urgency"), 1),
+        job["scheduled_time"].timestamp(),
+    )
+
+
+class JobScheduler:
+    # Two binary heaps (O(log n) add and pop): waiting jobs ordered by scheduled time,
+    # and due jobs ordered by job_priority, so once several jobs are due the one
+    # nearest its deadline is dispatched first. An asyncio loop sleeps until the next
+    # scheduled_time and hands due jobs to dispatch in batches. dispatch(jobs)
+    # returns the jobs it could not place; those are retried after retry_interval
+    # seconds. Cancelled or re-added jobs are dropped lazily when they reach the top
+    # of a heap.
+    def __init__(self, dispatch, clock=None, batch_size=256, retry_interval=300, max_sleep=60):
+        self.dispatch = dispatch
+        self.clock = clock or SystemClock()
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.max_sleep = max_sleep
+        self.dispatched = 0
+        self.retried = 0
+        self.failed_batches = 0
+        self._heap = []
+        self._ready = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, job, not_before=None):
+        start = job["scheduled_time"].timestamp()
+        if not_before is not None:
+            start = max(start, not_before.timestamp())
+        entry = [start, next(self._counter), job]
+        with self._lock:
+            previous = self._entries.get(job["job_id"])
+            if previous is not None:
+                previous[2] = None
+            self._entries[job["job_id"]] = entry
+            heapq.heappush(self._heap, entry)
+            is_next = self._heap[0] is entry
+        if is_next:
+            self._wake()
+
+    def cancel(self, job_id):
+        with self._lock:
+            entry = self._entries.pop(job_id, None)
+            if entry is not None:
+                entry[2] = None
+
+    def next_time(self):
+        with self._lock:
+            self._discard_cancelled()
+            if self._ready:
+                return self._ready[0][2][0]
+            return self._heap[0][0] if self._heap else None
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        while self._ready and self._ready[0][2][2] is None:
+            heapq.heappop(self._ready)
+
+    def pop_due(self, limit=None):
+        # Removes and returns up to limit jobs whose scheduled time has passed, nearest
+        # due date first.
+        now = self.clock.now().timestamp()
+        due = []
+        with self._lock:
+            self._discard_cancelled()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if entry[2] is not None:
+                    heapq.heappush(self._ready, (job_priority(entry[2]), entry[1], entry))
+            while limit is None or len(due) < limit:
+                self._discard_cancelled()
+                if not self._ready:
+                    break
+                job = heapq.heappop(self._ready)[2][2]
+                del self._entries[job["job_id"]]
+                due.append(job)
+        return due
+
+    def dispatch_due(self):
+        # Dispatches every due job in batches; returns how many were dispatched.
+        count = 0
+        while True:
+            batch = self.pop_due(self.batch_size)
+            if not batch:
+                return count
+            count += len(batch)
+            self.dispatched += len(batch)
+            try:
+                unplaced = self.dispatch(batch) or []
+            except Exception:
+                self.failed_batches += 1
+                unplaced = batch
+            retry_at = self.clock.now() + datetime.timedelta(seconds=self.retry_interval)
+            for job in unplaced:
+                self.retried += 1
+                self.add(job, not_before=retry_at)
+
+    def run_until(self, moment):
+        # Simulated-clock harness: steps the clock from one scheduled time to the next
+        # up to moment, dispatching due jobs at each step.
+        while True:
+            next_time = self.next_time()
+            if next_time is None or next_time > moment.timestamp():
+                break
+            self.clock.set(datetime.datetime.fromtimestamp(next_time))
+            self.dispatch_due()
+        self.clock.set(moment)
+        self.dispatch_due()
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while not self._stopping:
+            self.dispatch_due()
+            next_time = self.next_time()
+            timeout = self.max_sleep
+            if next_time is not None:
+                timeout = min(max(next_time - self.clock.now().timestamp(), 0), self.max_sleep)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _wake(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self):
+        # Runs the scheduler loop on its own thread, independent of UI reruns.
+        if self._thread is None:
+            self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="job-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._wake()
+
+    def stats(self):
+        next_time = self.next_time()
+        return {
+            "pending": len(self),
+            "dispatched": self.dispatched,
+            "retried": self.retried,
+            "failed_batches": self.failed_batches,
+            "next_run": datetime.datetime.fromtimestamp(next_time).strftime("%Y-%m-%d %H:%M") if next_time else None,
+        }
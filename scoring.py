@@ -0,0 +1,154 @@
+import numpy as np
+
+from core_functions import due_date_multiplier
+from feature_cache import task_feature_cache
+from tracing import traced
+
+URGENCY_WEIGHTS = {"Low": 0.9, "Medium": 1.0, "High": 1.1}
+
+
+def skill_tokens(skills):
+    return [token.strip() for token in skills.lower().split(",") if token.strip()]
+
+
+def task_features(task_description, task_urgency, due_date, task_embedding):
+    # Everything in the score that depends only on the task, computed once per match.
+    return {
+        "embedding": np.asarray(task_embedding, dtype=np.float32),
+        "skills": [skill.lower() for skill in task_feature_cache.skills(task_description)],
+        "urgency_weight": URGENCY_WEIGHTS[task_urgency],
+        "due_date_multiplier": due_date_multiplier(due_date),
+        "complexity": task_feature_cache.complexity(task_description),
+    }
+
+
+def proficiency_means(individuals):
+    return np.array([
+        sum(ind["proficiencies"]) / (len(ind["proficiencies"]) * 10) if ind["proficiencies"] else 0
+        for ind in individuals
+    ], dtype=np.float32)
+
+
+def pack_skill_tokens(individuals):
+    # Vocabulary of skill tokens and a packed (individuals x tokens) bitmask.
+    vocab = {}
+    token_rows = []
+    for ind in individuals:
+        token_rows.append([vocab.setdefault(token, len(vocab)) for token in skill_tokens(ind["skills"])])
+    bits = np.zeros((len(token_rows), max(len(vocab), 1)), dtype=bool)
+    for row, columns in enumerate(token_rows):
+        bits[row, columns] = True
+    return vocab, np.packbits(bits, axis=1)
+
+
+class CandidateMatrix:
+    # Column-oriented view of a candidate list: unit skill embeddings, proficiency
+    # means, feedback offsets and a packed bitmask of each candidate's skill tokens.
+    @traced
+    def __init__(self, individuals, skill_embeddings, feedback):
+        self.individuals = list(individuals)
+        embeddings = np.asarray(skill_embeddings, dtype=np.float32).reshape(len(self.individuals), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.unit_embeddings = embeddings / norms
+        self.feedback = np.array([feedback.get(ind["id"], 0.0) for ind in self.individuals], dtype=np.float32)
+        self.proficiency = proficiency_means(self.individuals)
+        self.vocab, self.skill_bits = pack_skill_tokens(self.individuals)
+        self._skill_masks = {}
+
+    @classmethod
+    def from_columns(cls, unit_embeddings, feedback, proficiency, vocab, skill_bits, individuals=None):
+        # Wraps columns built elsewhere, such as a slice of a shared-memory roster.
+        matrix = cls.__new__(cls)
+        matrix.individuals = individuals
+        matrix.unit_embeddings = unit_embeddings
+        matrix.feedback = feedback
+        matrix.proficiency = proficiency
+        matrix.vocab = vocab
+        matrix.skill_bits = skill_bits
+        matrix._skill_masks = {}
+        return matrix
+
+    def __len__(self):
+        return len(self.unit_embeddings)
+
+    def _skill_mask(self, skill):
+        # A task skill matches every vocabulary token that contains it, mirroring the
+        # substring test `skill in ind["skills"]` used by the original loop.
+        mask = self._skill_masks.get(skill)
+        if mask is None:
+            hits = np.zeros(self.skill_bits.shape[1] * 8, dtype=bool)
+            hits[[idx for token, idx in self.vocab.items() if skill in token]] = True
+            mask = np.packbits(hits)
+            self._skill_masks[skill] = mask
+        return mask
+
+    def match_counts(self, skills):
+        counts = np.zeros(len(self), dtype=np.float32)
+        for skill in skills:
+            counts += np.any(self.skill_bits & self._skill_mask(skill), axis=1)
+        return counts
+
+    def similarities(self, task_embedding):
+        norm = np.linalg.norm(task_embedding)
+        return self.unit_embeddings @ (task_embedding / norm if norm else task_embedding)
+
+    def constant_bonus(self):
+        return self.feedback + self.proficiency
+
+    @traced
+    def score(self, features):
+        base = (self.similarities(features["embedding"]) + self.feedback + self.proficiency
+                + 0.1 * self.match_counts(features["skills"]))
+        return base * task_multiplier(features)
+
+    @traced
+    def score_many(self, features_list):
+        # Scores a batch of tasks against every candidate: one (tasks x candidates) matrix.
+        task_embeddings = np.stack([f["embedding"] for f in features_list]).astype(np.float32)
+        norms = np.linalg.norm(task_embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        scores = (task_embeddings / norms) @ self.unit_embeddings.T
+        scores += self.constant_bonus()
+        groups = {}
+        for row, features in enumerate(features_list):
+            groups.setdefault(tuple(features["skills"]), []).append(row)
+        for skills, rows in groups.items():
+            if skills:
+                scores[rows] += 0.1 * self.match_counts(skills)
+        scores *= np.array([task_multiplier(f) for f in features_list], dtype=np.float32)[:, None]
+        return scores
+
+    def explain(self, features, col):
+        # Reads only the candidate's own row, so explaining a placement is O(dim).
+        task_embedding = features["embedding"]
+        norm = np.linalg.norm(task_embedding)
+        similarity = float(self.unit_embeddings[col] @ (task_embedding / norm if norm else task_embedding))
+        bits = self.skill_bits[col]
+        match_bonus = 0.1 * sum(bool(np.any(bits & self._skill_mask(skill))) for skill in features["skills"])
+        base = similarity + float(self.feedback[col]) + float(self.proficiency[col]) + match_bonus
+        return {
+            "similarity": round(similarity, 4),
+            "feedback_adjustment": round(float(self.feedback[col]), 4),
+            "proficiency_bonus": round(float(self.proficiency[col]), 4),
+            "match_bonus": round(match_bonus, 4),
+            "urgency_weight": features["urgency_weight"],
+            "due_date_multiplier": features["due_date_multiplier"],
+            "complexity": round(features["complexity"], 4),
+            "final_score": round(base * task_multiplier(features), 4),
+        }
+
+
+def task_multiplier(features):
+    return features["urgency_weight"] * features["due_date_multiplier"] * (1 + features["complexity"])
+
+
+def top_k(scores, k):
+    # Indices of the k best scores in descending order.
+    scores = np.asarray(scores)
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
@@ -0,0 +1,187 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from allocation import is_free
+from ann_index import index_key
+from scoring import CandidateMatrix, pack_skill_tokens, proficiency_means, top_k
+from tracing import traced
+
+# Worker processes used by retrieval="sharded"; 0 means one per CPU.
+DEFAULT_WORKERS = int(os.environ.get("TASK_ALLOC_WORKERS", "0")) or os.cpu_count() or 1
+# Shards smaller than this are not split further, so tiny shifts stay in one job.
+MIN_SHARD_ROWS = 2048
+
+COLUMNS = ("embeddings", "feedback", "proficiency", "skill_bits", "free")
+
+# Per-process cache of attached segments and shard matrices, keyed by generation.
+_attached = {}
+
+
+def _share(array):
+    segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1),
+                                         name=f"task_alloc_{uuid.uuid4().hex[:12]}")
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+    view[...] = array
+    return segment, view
+
+
+def _attach(spec):
+    # Maps every column of a generation into this worker, dropping older generations.
+    generation = spec["generation"]
+    if generation not in _attached:
+        for old in list(_attached):
+            segments = _attached.pop(old)["segments"]
+            for segment in segments:
+                segment.close()
+        segments = []
+        arrays = {}
+        for column in COLUMNS:
+            name, shape, dtype = spec["columns"][column]
+            segment = shared_memory.SharedMemory(name=name)
+            segments.append(segment)
+            arrays[column] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        _attached[generation] = {"segments": segments, "arrays": arrays, "vocab": spec["vocab"], "matrices": {}}
+    return _attached[generation]
+
+
+def score_shard(spec, start, stop, features_list, k):
+    # Worker entry point: scores rows [start, stop) of the shared roster against every
+    # task and returns, per task, the global rows and scores of the k best free rows.
+    attached = _attach(spec)
+    arrays = attached["arrays"]
+    matrix = attached["matrices"].get((start, stop))
+    if matrix is None:
+        matrix = CandidateMatrix.from_columns(
+            arrays["embeddings"][start:stop], arrays["feedback"][start:stop], arrays["proficiency"][start:stop],
+            attached["vocab"], arrays["skill_bits"][start:stop]
+        )
+        attached["matrices"][(start, stop)] = matrix
+    scores = matrix.score_many(features_list)
+    scores[:, arrays["free"][start:stop] == 0] = -np.inf
+    results = []
+    for row in scores:
+        best = top_k(row, k)
+        best = best[np.isfinite(row[best])]
+        results.append((best + start, row[best]))
+    return results
+
+
+class ShardedScorer:
+    # Scores large rosters across a pool of worker processes. The skill embeddings,
+    # feedback, proficiency and skill-token columns are copied once into shared memory
+    # with rows grouped by shift, and each shift is split into contiguous shards; a
+    # match sends only the task features to the workers, each returns its local top-k
+    # and the results are merged here. Availability changes are written straight into
+    # the shared free mask; new people or changed skills or shifts rebuild the columns
+    # at the next match.
+    def __init__(self, individuals, feedback, embedding_store, model, workers=DEFAULT_WORKERS):
+        self.individuals = individuals
+        self.feedback = feedback
+        self.embedding_store = embedding_store
+        self.model = model
+        self.workers = max(1, workers)
+        self._pool = None
+        self._segments = []
+        self._spec = None
+        self._rows = []
+        self._row_of = {}
+        self._keys = {}
+        self._shards = {}
+        self._free = None
+        self._stale = True
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+
+    def sync(self, individual):
+        with self._lock:
+            row = self._row_of.get(individual["id"])
+            if row is None or self._keys[individual["id"]] != (index_key(individual), individual["shift"]):
+                self._stale = True
+            elif self._free is not None:
+                self._free[row] = is_free(individual)
+
+    def _split(self, start, stop):
+        count = max(1, min(self.workers, (stop - start) // MIN_SHARD_ROWS))
+        bounds = np.linspace(start, stop, count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def _build(self):
+        rows = sorted(self.individuals, key=lambda ind: ind["shift"])
+        embeddings = np.asarray(self.embedding_store.embeddings_for(rows, self.model), dtype=np.float32)
+        embeddings = embeddings.reshape(len(rows), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vocab, skill_bits = pack_skill_tokens(rows)
+        columns = {
+            "embeddings": embeddings / norms,
+            "feedback": np.array([self.feedback.get(ind["id"], 0.0) for ind in rows], dtype=np.float32),
+            "proficiency": proficiency_means(rows),
+            "skill_bits": skill_bits,
+            "free": np.array([is_free(ind) for ind in rows], dtype=np.uint8),
+        }
+        self._release()
+        spec = {"generation": uuid.uuid4().hex, "vocab": vocab, "columns": {}}
+        for column in COLUMNS:
+            segment, view = _share(columns[column])
+            self._segments.append(segment)
+            spec["columns"][column] = (segment.name, view.shape, view.dtype.str)
+            if column == "free":
+                self._free = view
+        self._spec = spec
+        self._rows = rows
+        self._row_of = {ind["id"]: row for row, ind in enumerate(rows)}
+        self._keys = {ind["id"]: (index_key(ind), ind["shift"]) for ind in rows}
+        self._shards = {}
+        start = 0
+        for row in range(1, len(rows) + 1):
+            if row == len(rows) or rows[row]["shift"] != rows[start]["shift"]:
+                self._shards[rows[start]["shift"]] = self._split(start, row)
+                start = row
+        self._stale = False
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    @traced
+    def top_k(self, features_list, shift, k):
+        # For each task, up to k (individual, score) pairs of free individuals in the
+        # shift ("Any" for all shifts), best first.
+        with self._lock:
+            if self._stale:
+                self._build()
+            shards = [shard for name, ranges in self._shards.items() if shift in ("Any", name) for shard in ranges]
+            if not shards:
+                return [[] for _ in features_list]
+            pool = self._executor()
+            futures = [pool.submit(score_shard, self._spec, start, stop, features_list, k) for start, stop in shards]
+            partials = [future.result() for future in futures]
+            results = []
+            for task_no in range(len(features_list)):
+                rows = np.concatenate([partial[task_no][0] for partial in partials])
+                scores = np.concatenate([partial[task_no][1] for partial in partials])
+                results.append([(self._rows[rows[i]], float(scores[i])) for i in top_k(scores, k)])
+            return results
+
+    def _release(self):
+        self._free = None
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            self._release()
+            self._stale = True
@@ -0,0 +1,375 @@
+import atexit
+import contextlib
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+OWNER_LOCK = ".owner.lock"
+_claims = {}
+_claims_lock = threading.Lock()
+# Version of a stored record in SQL; records saved before versioning count as 0.
+_VERSION = "COALESCE(json_extract({}.data, '$.version'), 0)"
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot store value of type {type(value).__name__}")
+
+
+def _decode(obj):
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def dumps(record):
+    return json.dumps(record, default=_encode)
+
+
+def loads(data):
+    return json.loads(data, object_hook=_decode)
+
+
+class StorageBackend:
+    # Interface shared by all backends. Collections hold either keyed records
+    # (put/delete) or append-only records (append); load yields them in insert order.
+    def load(self, collection):
+        raise NotImplementedError
+
+    def count(self, collection):
+        raise NotImplementedError
+
+    def put(self, collection, key, record):
+        raise NotImplementedError
+
+    def append(self, collection, record):
+        raise NotImplementedError
+
+    def delete(self, collection, key):
+        raise NotImplementedError
+
+    def compare_and_put(self, collection, key, record, expected_version):
+        # Writes record only if the stored one is at expected_version (a missing record
+        # or one without a version counts as version 0). Returns whether it was written.
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def changed_elsewhere(self):
+        # Whether another process has written to the store since the last call.
+        return False
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Groups every write made inside the block into one commit at the end.
+        yield self
+        self.flush()
+
+
+class MemoryBackend(StorageBackend):
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def load(self, collection):
+        with self._lock:
+            records = list(self._collections.get(collection, {}).values())
+        return (loads(data) for data in records)
+
+    def count(self, collection):
+        return len(self._collections.get(collection, {}))
+
+    def put(self, collection, key, record):
+        with self._lock:
+            self._collections.setdefault(collection, {})[("key", key)] = dumps(record)
+
+    def append(self, collection, record):
+        with self._lock:
+            records = self._collections.setdefault(collection, {})
+            records[("seq", len(records))] = dumps(record)
+
+    def delete(self, collection, key):
+        with self._lock:
+            self._collections.get(collection, {}).pop(("key", key), None)
+
+    def compare_and_put(self, collection, key, record, expected_version):
+        with self._lock:
+            records = self._collections.setdefault(collection, {})
+            stored = records.get(("key", key))
+            if (loads(stored).get("version", 0) if stored is not None else 0) != expected_version:
+                return False
+            records[("key", key)] = dumps(record)
+            return True
+
+
+class SQLiteBackend(StorageBackend):
+    # SQLite in WAL mode. Writes are buffered and committed in one transaction once
+    # batch_size writes are pending, on flush(), before any read and at exit.
+    # Repeated writes to the same key within a batch are coalesced. A buffered record
+    # never replaces a stored one with a higher "version", so a process flushing a
+    # stale copy cannot undo a compare_and_put made by another process.
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, collection TEXT NOT NULL, key TEXT, data TEXT NOT NULL, "
+            "UNIQUE(collection, key))"
+        )
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._appends = []
+        self._batch_depth = 0
+        self._data_version = None
+        atexit.register(self.flush)
+
+    def _maybe_flush(self):
+        if not self._batch_depth and len(self._pending) + len(self._appends) >= self.batch_size:
+            self.flush()
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Holds back size-triggered flushes so the whole block commits in one
+        # transaction when it ends.
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending and not self._appends:
+                return
+            upserts = [(c, k, d) for (c, k), d in self._pending.items() if d is not None]
+            deletes = [(c, k) for (c, k), d in self._pending.items() if d is None]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO records (collection, key, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(collection, key) DO UPDATE SET data = excluded.data "
+                    "WHERE " + _VERSION.format("records") + " <= " + _VERSION.format("excluded"), upserts)
+                self._conn.executemany("DELETE FROM records WHERE collection = ? AND key = ?", deletes)
+                self._conn.executemany("INSERT INTO records (collection, data) VALUES (?, ?)", self._appends)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending = {}
+            self._appends = []
+
+    def changed_elsewhere(self):
+        # data_version only moves when another connection commits.
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = version != self._data_version
+            self._data_version = version
+            return changed
+
+    def load(self, collection):
+        self.flush()
+        cursor = self._conn.execute("SELECT data FROM records WHERE collection = ? ORDER BY seq", (collection,))
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for (data,) in rows:
+                yield loads(data)
+
+    def count(self, collection):
+        self.flush()
+        return self._conn.execute("SELECT COUNT(*) FROM records WHERE collection = ?", (collection,)).fetchone()[0]
+
+    def put(self, collection, key, record):
+        with self._lock:
+            self._pending[(collection, key)] = dumps(record)
+            self._maybe_flush()
+
+    def append(self, collection, record):
+        with self._lock:
+            self._appends.append((collection, dumps(record)))
+            self._maybe_flush()
+
+    def delete(self, collection, key):
+        with self._lock:
+            self._pending[(collection, key)] = None
+            self._maybe_flush()
+
+    def compare_and_put(self, collection, key, record, expected_version):
+        # Reads and writes in one IMMEDIATE transaction after the buffered writes are
+        # committed, so the version check and the write are atomic across processes.
+        with self._lock:
+            self.flush()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT " + _VERSION.format("records") + " FROM records "
+                                         "WHERE collection = ? AND key = ?", (collection, key)).fetchone()
+                written = (row[0] if row is not None else 0) == expected_version
+                if written:
+                    self._conn.execute(
+                        "INSERT INTO records (collection, key, data) VALUES (?, ?, ?) "
+                        "ON CONFLICT(collection, key) DO UPDATE SET data = excluded.data",
+                        (collection, key, dumps(record)))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return written
+
+
+class StoredList:
+    # List-like view of an append-only collection. Nothing is read from the backend
+    # until the contents are first iterated; appends are written through.
+    def __init__(self, backend, collection, key_field=None):
+        self.backend = backend
+        self.collection = collection
+        self.key_field = key_field
+        self._items = None
+        self._lock = threading.Lock()
+
+    def _loaded(self):
+        with self._lock:
+            if self._items is None:
+                self._items = list(self.backend.load(self.collection))
+            return self._items
+
+    def append(self, item):
+        with self._lock:
+            if self._items is not None:
+                self._items.append(item)
+        if self.key_field:
+            self.backend.put(self.collection, item[self.key_field], item)
+        else:
+            self.backend.append(self.collection, item)
+
+    def save(self, item):
+        # Writes a keyed item back after it was modified in place.
+        self.backend.put(self.collection, item[self.key_field], item)
+
+    def __len__(self):
+        if self._items is not None:
+            return len(self._items)
+        return self.backend.count(self.collection)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(list(self._loaded()))
+
+    def __reversed__(self):
+        return reversed(list(self._loaded()))
+
+    def __getitem__(self, position):
+        return self._loaded()[position]
+
+
+class StoredDict:
+    # Dict-like view of a keyed collection of {"key": ..., "value": ...} records.
+    # version counts writes.
+    def __init__(self, backend, collection):
+        self.backend = backend
+        self.collection = collection
+        self.version = 0
+        self._items = None
+
+    def _loaded(self):
+        if self._items is None:
+            self._items = {record["key"]: record["value"] for record in self.backend.load(self.collection)}
+        return self._items
+
+    def __getitem__(self, key):
+        return self._loaded()[key]
+
+    def __setitem__(self, key, value):
+        self._loaded()[key] = value
+        self.version += 1
+        self.backend.put(self.collection, key, {"key": key, "value": value})
+
+    def __contains__(self, key):
+        return key in self._loaded()
+
+    def __len__(self):
+        return len(self._loaded())
+
+    def get(self, key, default=None):
+        return self._loaded().get(key, default)
+
+    def reload(self):
+        # Drops the cached items so the next read sees writes from other processes.
+        if self._items is not None:
+            self._items = None
+            self.version += 1
+
+    def items(self):
+        return self._loaded().items()
+
+
+class DataDirInUse(RuntimeError):
+    pass
+
+
+def claim_data_dir(directory="data"):
+    # Makes this process the only owner of a data directory: the one process that runs
+    # the allocation engine and writes the embedding store and match history. Other
+    # processes may share the SQLite store (the app with ALLOCATION_API_URL set is a
+    # client of the API server and does not claim). The lock lasts until the process
+    # exits; claiming again from the owning process is a no-op.
+    path = os.path.realpath(directory)
+    with _claims_lock:
+        if path in _claims:
+            return
+        os.makedirs(path, exist_ok=True)
+        f = open(os.path.join(path, OWNER_LOCK), "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            try:
+                f.seek(0)
+                owner = f.read().strip() or "unknown"
+            except OSError:
+                owner = "unknown"
+            f.close()
+            raise DataDirInUse(f"{path} is owned by process {owner}. If that is the API server, set "
+                               f"ALLOCATION_API_URL so the app runs as its client.")
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        _claims[path] = f
+
+
+def open_backend(kind=None, path=None):
+    kind = kind or os.environ.get("TASK_ALLOC_STORAGE", "sqlite")
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(path or os.environ.get("TASK_ALLOC_DB", os.path.join("data", "task_allocation.db")))
+    raise ValueError(f"Unknown storage backend: {kind}")
@@ -0,0 +1,95 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core_functions import (
+    auto_feedback_generator_batch, generate_team_suggestions_batch, predict_future_tasks_batch,
+    suggest_optimal_shift_batch
+)
+
+
+def insight_fingerprint(individual):
+    # The only fields the per-person artifacts depend on.
+    return (individual["tasks_completed"], individual["avg_feedback"], individual["skills"], individual["shift"])
+
+
+def snapshot(individual):
+    return individual.to_dict() if hasattr(individual, "to_dict") else dict(individual)
+
+
+class TeamInsights:
+    # Precomputes Team Suggestions artifacts (suggestions, auto feedback, predicted
+    # tasks, shift suggestion) on a background pool. notify() is called whenever an
+    # individual changes; work is queued only when their fingerprint differs from
+    # the last computed or queued one, and queued people are processed in batches.
+    def __init__(self, max_workers=1, batch_size=64):
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="team-insights")
+        self._lock = threading.Lock()
+        self._results = {}
+        self._queued = {}
+        self._dirty = {}
+        self._draining = False
+        self.computed = 0
+
+    def notify(self, individual):
+        fingerprint = insight_fingerprint(individual)
+        with self._lock:
+            if self._queued.get(individual["id"]) == fingerprint:
+                return
+            done = self._results.get(individual["id"])
+            if done and done[0] == fingerprint:
+                self._queued.pop(individual["id"], None)
+                self._dirty.pop(individual["id"], None)
+                return
+            self._queued[individual["id"]] = fingerprint
+            self._dirty[individual["id"]] = snapshot(individual)
+            if self._draining:
+                return
+            self._draining = True
+        self._executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._dirty:
+                    self._draining = False
+                    return
+                ids = list(itertools.islice(self._dirty, self.batch_size))
+                batch = [self._dirty.pop(i) for i in ids]
+            try:
+                self._compute(batch)
+            except Exception:
+                # Drop the failed batch; the next change to those people re-queues them.
+                with self._lock:
+                    for ind in batch:
+                        if self._queued.get(ind["id"]) == insight_fingerprint(ind):
+                            del self._queued[ind["id"]]
+
+    def _compute(self, batch):
+        suggestions = generate_team_suggestions_batch(batch)
+        feedback = auto_feedback_generator_batch(batch)
+        tasks = predict_future_tasks_batch(batch)
+        shifts = suggest_optimal_shift_batch(batch)
+        with self._lock:
+            for ind, sugg, fb, pred, shift in zip(batch, suggestions, feedback, tasks, shifts):
+                fingerprint = insight_fingerprint(ind)
+                self._results[ind["id"]] = (fingerprint, {
+                    "suggestions": sugg,
+                    "auto_feedback": fb,
+                    "predicted_tasks": pred,
+                    "shift_suggestion": shift,
+                })
+                if self._queued.get(ind["id"]) == fingerprint:
+                    del self._queued[ind["id"]]
+            self.computed += len(batch)
+
+    def get(self, individual_id):
+        # Latest finished artifacts for the individual, or None if never computed.
+        with self._lock:
+            result = self._results.get(individual_id)
+        return result[1] if result else None
+
+    def pending(self):
+        with self._lock:
+            return len(self._queued)
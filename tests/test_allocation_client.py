@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+
+from allocation_client import AllocationClient, AllocationServiceError
+from api import AllocationService
+from benchmarks.generators import HashingEncoder
+from engine import AllocationEngine, load_state
+from storage import SQLiteBackend
+
+PERSON = "1a2b3c4d"
+
+
+@pytest.fixture
+def service_url(tmp_path):
+    state = load_state(SQLiteBackend(str(tmp_path / "roster.db")), data_dir=str(tmp_path / "server"))
+    state["individuals"].storage.flush()
+    service = AllocationService(AllocationEngine(state, HashingEncoder()))
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(service.handle, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", state
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+
+
+def client_state(tmp_path):
+    return load_state(SQLiteBackend(str(tmp_path / "roster.db")), data_dir=str(tmp_path / "app"))
+
+
+def test_assignments_made_by_the_api_reach_the_app_roster(tmp_path, service_url):
+    url, server_state = service_url
+    roster = client_state(tmp_path)["individuals"]
+    client = AllocationClient(url, roster)
+
+    ranked = client.match("build a flask api", task_shift="Morning")
+    assert ranked and all(roster.get(ind["id"]) is ind for ind, _ in ranked)
+
+    assert client.assign(roster.get(PERSON), "build a flask api", task_shift="Morning") is not None
+    assert roster.get(PERSON)["current_task"] == "build a flask api"
+    assert client.assign(roster.get(PERSON), "another task") is None
+
+    candidate, score, explanation, predicted_time = client.allocate("write react components", task_shift="Morning")
+    assert candidate is roster.get("2b3c4d5e") and candidate["current_task"] == "write react components"
+    assert client.allocate("anything", task_shift="Morning")[0] is None
+
+    client.record_match("build a flask api", "Backend", "High", ranked, None)
+    assert [record["category"] for record in server_state["match_history"].page(0, 10)] == ["Backend"]
+
+
+def test_app_edits_reach_the_api(tmp_path, service_url):
+    url, _ = service_url
+    state = client_state(tmp_path)
+    state["individuals"].get(PERSON)["available"] = False
+    state["individuals"].storage.flush()
+
+    ranked = AllocationClient(url, state["individuals"]).match("build a flask api", task_shift="Morning")
+    assert PERSON not in [ind["id"] for ind, _ in ranked]
+
+
+def test_unreachable_service_raises(tmp_path):
+    client = AllocationClient("http://127.0.0.1:9", client_state(tmp_path)["individuals"], timeout=2)
+    with pytest.raises(AllocationServiceError):
+        client.match("build a flask api")
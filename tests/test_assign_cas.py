@@ -0,0 +1,72 @@
+import multiprocessing
+
+from core_functions import assign_task, release_task
+from engine import load_state
+from storage import MemoryBackend, SQLiteBackend
+
+PERSON = "1a2b3c4d"
+PROCESSES = 4
+
+
+def claim(db_path, data_dir, worker, barrier, results):
+    state = load_state(SQLiteBackend(str(db_path)), data_dir=str(data_dir))
+    individual = state["individuals"].get(PERSON)
+    version = individual["version"]
+    barrier.wait()
+    predicted = assign_task(individual, f"task-{worker}", expected_version=version)
+    results.put((worker, predicted is not None))
+
+
+def test_only_one_process_claims_an_individual(tmp_path):
+    db_path = tmp_path / "roster.db"
+    seeded = SQLiteBackend(str(db_path))
+    load_state(seeded, data_dir=str(tmp_path))
+    seeded.flush()
+    assigned_before = next(r for r in seeded.load("individuals") if r["id"] == PERSON)["tasks_assigned"]
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(PROCESSES)
+    results = ctx.Queue()
+    workers = [ctx.Process(target=claim, args=(db_path, tmp_path, worker, barrier, results))
+               for worker in range(PROCESSES)]
+    for process in workers:
+        process.start()
+    outcomes = dict(results.get(timeout=120) for _ in workers)
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    winners = [worker for worker, claimed in outcomes.items() if claimed]
+    assert len(winners) == 1
+    stored = next(r for r in SQLiteBackend(str(db_path)).load("individuals") if r["id"] == PERSON)
+    assert stored["current_task"] == f"task-{winners[0]}"
+    assert stored["tasks_assigned"] == assigned_before + 1
+    assert stored["version"] == 1
+
+
+def test_stale_copy_cannot_overwrite_a_newer_claim(tmp_path):
+    db_path = str(tmp_path / "roster.db")
+    first_storage, second_storage = SQLiteBackend(db_path), SQLiteBackend(db_path)
+    first = load_state(first_storage, data_dir=str(tmp_path))["individuals"].get(PERSON)
+    first_storage.flush()
+    second = load_state(second_storage, data_dir=str(tmp_path))["individuals"].get(PERSON)
+
+    assert assign_task(first, "first task") is not None
+    assert assign_task(second, "second task") is None
+    # The stale copy's buffered writes must not undo the stored claim either.
+    second["avg_feedback"] = 1.0
+    second_storage.flush()
+    stored = next(r for r in SQLiteBackend(db_path).load("individuals") if r["id"] == PERSON)
+    assert stored["current_task"] == "first task"
+
+    assert release_task(first, task="first task")
+    stored = next(r for r in SQLiteBackend(db_path).load("individuals") if r["id"] == PERSON)
+    assert stored["current_task"] is None and stored["version"] == 2
+
+
+def test_memory_backend_compare_and_put():
+    backend = MemoryBackend()
+    assert backend.compare_and_put("individuals", PERSON, {"id": PERSON, "version": 1}, 0)
+    assert not backend.compare_and_put("individuals", PERSON, {"id": PERSON, "version": 1}, 0)
+    assert backend.compare_and_put("individuals", PERSON, {"id": PERSON, "version": 2}, 1)
+    assert list(backend.load("individuals")) == [{"id": PERSON, "version": 2}]
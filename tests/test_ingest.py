@@ -0,0 +1,44 @@
+import json
+
+import pandas as pd
+import pytest
+
+from analytics import records_csv
+from engine import SEED_INDIVIDUALS
+from ingest import RosterImporter
+from roster import FIELDS, Roster
+from storage import MemoryBackend
+
+
+def export(records, path, fmt):
+    # The same layouts a roster export is written in.
+    if fmt == "csv":
+        path.write_bytes(records_csv(records, list(FIELDS)))
+    elif fmt == "jsonl":
+        path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    else:
+        pd.DataFrame(records).to_parquet(path)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "parquet"])
+def test_exported_roster_imports_back(tmp_path, fmt):
+    records = Roster(SEED_INDIVIDUALS).to_records()
+    path = tmp_path / f"roster.{fmt}"
+    export(records, path, fmt)
+
+    imported = Roster()
+    report = RosterImporter(imported, MemoryBackend()).run(str(path), fmt)
+
+    assert report["rejects"] == []
+    assert report["added"] == len(records)
+    for original, copy in zip(records, imported):
+        for field in ("name", "skills", "proficiencies", "shift", "available"):
+            assert copy[field] == original[field]
+
+
+def test_reimporting_an_export_adds_nobody(tmp_path):
+    roster = Roster(SEED_INDIVIDUALS)
+    path = tmp_path / "roster.jsonl"
+    export(roster.to_records(), path, "jsonl")
+    report = RosterImporter(roster, MemoryBackend()).run(str(path), "jsonl")
+    assert report["added"] == 0 and report["duplicates"] == len(SEED_INDIVIDUALS)
@@ -0,0 +1,21 @@
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def test_short_batch_result_fails_only_the_unanswered_item():
+    def double_except_three(items):
+        return [item * 2 for item in items if item != 3]
+
+    batcher = MicroBatcher(double_except_three, max_latency=0.05)
+    futures = [batcher.submit(item) for item in range(5)]
+    assert [future.result(timeout=5) for future in futures[:3]] == [0, 2, 4]
+    with pytest.raises(RuntimeError, match="returned 0 results for 1 items"):
+        futures[3].result(timeout=5)
+    assert futures[4].result(timeout=5) == 8
+
+
+def test_batch_function_returning_nothing_does_not_hang():
+    batcher = MicroBatcher(lambda items: [])
+    with pytest.raises(RuntimeError):
+        batcher(1, timeout=5)
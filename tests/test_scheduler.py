@@ -0,0 +1,126 @@
+import datetime
+
+from scheduler import JobScheduler, SimulatedClock
+
+START = datetime.datetime(2025, 1, 1, 9, 0)
+
+
+def make_job(job_id, minutes, due_hours=None, urgency="Medium"):
+    scheduled = START + datetime.timedelta(minutes=minutes)
+    return {
+        "job_id": job_id,
+        "task_description": f"Job {job_id}",
+        "urgency": urgency,
+        "task_shift": "Any",
+        "required_quals": [],
+        "scheduled_time": scheduled,
+        "due_date": START + datetime.timedelta(hours=due_hours) if due_hours is not None else None,
+        "assigned": False,
+    }
+
+
+def recording_scheduler(**kwargs):
+    clock = SimulatedClock(START)
+    batches = []
+
+    def dispatch(batch):
+        batches.append((clock.now(), [job["job_id"] for job in batch]))
+        return []
+
+    return JobScheduler(dispatch, clock=clock, **kwargs), clock, batches
+
+
+def test_due_jobs_go_out_nearest_deadline_first():
+    scheduler, clock, _ = recording_scheduler()
+    scheduler.add(make_job("late-deadline", 0, due_hours=9))
+    scheduler.add(make_job("soon", 5, due_hours=1))
+    scheduler.add(make_job("middle", 10, due_hours=3))
+    clock.advance(minutes=30)
+    assert [job["job_id"] for job in scheduler.pop_due()] == ["soon", "middle", "late-deadline"]
+
+
+def test_urgency_orders_due_jobs_without_deadlines():
+    scheduler, clock, _ = recording_scheduler()
+    scheduler.add(make_job("low", 0, urgency="Low"))
+    scheduler.add(make_job("high", 10, urgency="High"))
+    scheduler.add(make_job("dated", 20, due_hours=48, urgency="Low"))
+    clock.advance(minutes=30)
+    assert [job["job_id"] for job in scheduler.pop_due()] == ["dated", "high", "low"]
+
+
+def test_jobs_wait_for_their_scheduled_time():
+    scheduler, clock, batches = recording_scheduler()
+    scheduler.add(make_job("first", 0))
+    scheduler.add(make_job("second", 60, due_hours=1))
+    clock.advance(minutes=30)
+    assert [job["job_id"] for job in scheduler.pop_due()] == ["first"]
+    scheduler.run_until(START + datetime.timedelta(hours=2))
+    assert batches == [(START + datetime.timedelta(minutes=60), ["second"])]
+    assert len(scheduler) == 0
+
+
+def test_cancelled_and_replaced_jobs_are_not_dispatched():
+    scheduler, _, batches = recording_scheduler()
+    scheduler.add(make_job("cancelled", 0))
+    scheduler.add(make_job("moved", 5))
+    scheduler.add(make_job("kept", 10))
+    scheduler.cancel("cancelled")
+    scheduler.add(make_job("moved", 120))
+    assert len(scheduler) == 2
+    scheduler.run_until(START + datetime.timedelta(hours=3))
+    assert [ids for _, ids in batches] == [["kept"], ["moved"]]
+    assert batches[1][0] == START + datetime.timedelta(minutes=120)
+
+
+def test_cancel_after_job_became_due():
+    scheduler, clock, _ = recording_scheduler(batch_size=1)
+    scheduler.add(make_job("a", 0, due_hours=1))
+    scheduler.add(make_job("b", 0, due_hours=2))
+    clock.advance(minutes=1)
+    assert [job["job_id"] for job in scheduler.pop_due(limit=1)] == ["a"]
+    scheduler.cancel("b")
+    assert scheduler.pop_due() == []
+    assert scheduler.next_time() is None
+
+
+def test_batches_are_capped_and_unplaced_jobs_retried_later():
+    clock = SimulatedClock(START)
+    calls = []
+
+    def dispatch(batch):
+        calls.append((clock.now(), [job["job_id"] for job in batch]))
+        # Nobody is free for "busy" on the first attempt.
+        return [job for job in batch if job["job_id"] == "busy" and len(calls) == 1]
+
+    scheduler = JobScheduler(dispatch, clock=clock, batch_size=2, retry_interval=600)
+    scheduler.add(make_job("busy", 0, due_hours=1))
+    for i in range(4):
+        scheduler.add(make_job(f"job-{i}", 0, due_hours=5))
+    scheduler.run_until(START + datetime.timedelta(minutes=5))
+    assert [len(ids) for _, ids in calls] == [2, 2, 1]
+    assert calls[0][1][0] == "busy"
+    assert len(scheduler) == 1 and scheduler.retried == 1
+
+    scheduler.run_until(START + datetime.timedelta(minutes=9))
+    assert len(calls) == 3
+    scheduler.run_until(START + datetime.timedelta(minutes=15))
+    assert calls[-1] == (START + datetime.timedelta(minutes=10), ["busy"])
+    assert len(scheduler) == 0 and scheduler.dispatched == 6
+
+
+def test_failed_dispatch_requeues_the_batch():
+    clock = SimulatedClock(START)
+    attempts = []
+
+    def dispatch(batch):
+        attempts.append(clock.now())
+        if len(attempts) == 1:
+            raise RuntimeError("allocation backend unavailable")
+        return []
+
+    scheduler = JobScheduler(dispatch, clock=clock, retry_interval=60)
+    scheduler.add(make_job("job", 0))
+    scheduler.run_until(START + datetime.timedelta(minutes=5))
+    assert scheduler.failed_batches == 1
+    assert attempts == [START, START + datetime.timedelta(minutes=1)]
+    assert len(scheduler) == 0
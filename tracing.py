@@ -0,0 +1,212 @@
+import bisect
+import functools
+import json
+import math
+import os
+import re
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets (the last one is +Inf).
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+           math.inf)
+
+_enabled = os.environ.get("TASK_ALLOC_TRACING", "0") == "1"
+_histograms = {}
+_stats_sources = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    # Fixed-bucket latency histogram; quantiles are estimated from the buckets.
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "calls": self.count,
+            "total_s": round(self.total, 6),
+            "mean_ms": round(1000 * self.total / self.count, 4) if self.count else None,
+            "p50_ms": _ms(self.quantile(0.5)),
+            "p95_ms": _ms(self.quantile(0.95)),
+            "p99_ms": _ms(self.quantile(0.99)),
+            "max_ms": round(1000 * self.max, 3),
+        }
+
+
+def _ms(seconds):
+    return round(1000 * seconds, 3) if seconds is not None else None
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def record(name, seconds):
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    histogram.observe(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    # Context manager timing a block under name; a shared no-op when tracing is off.
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def traced(fn=None, name=None):
+    # Decorator timing every call of fn. When tracing is off the only cost is the
+    # wrapper call and one flag check.
+    if fn is None:
+        return functools.partial(traced, name=name)
+    name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - started)
+    return wrapper
+
+
+def register_stats(name, source):
+    # source() returns a dict of numbers (e.g. cache hits and misses) that is read
+    # at report time and exported as gauges.
+    _stats_sources[name] = source
+
+
+def collect_stats():
+    stats = {}
+    for name, source in list(_stats_sources.items()):
+        try:
+            stats[name] = source()
+        except Exception as exc:
+            stats[name] = {"error": str(exc)}
+    return stats
+
+
+def report():
+    with _lock:
+        histograms = dict(_histograms)
+    return {
+        "enabled": _enabled,
+        "spans": {name: histograms[name].summary() for name in sorted(histograms)},
+        "stats": collect_stats(),
+    }
+
+
+def export_json(path=None):
+    data = json.dumps(report(), indent=2, default=str)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+    return data
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}_{key}", item, out)
+
+
+def prometheus_text():
+    # Prometheus text exposition format: one histogram family for span latencies
+    # and registered stats flattened into gauges.
+    with _lock:
+        histograms = dict(_histograms)
+    lines = ["# HELP task_alloc_span_seconds Latency of traced calls and blocks.",
+             "# TYPE task_alloc_span_seconds histogram"]
+    for name in sorted(histograms):
+        histogram = histograms[name]
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS, histogram.buckets):
+            cumulative += bucket
+            le = "+Inf" if bound == math.inf else repr(bound)
+            lines.append(f'task_alloc_span_seconds_bucket{{span="{_label(name)}",le="{le}"}} {cumulative}')
+        lines.append(f'task_alloc_span_seconds_sum{{span="{_label(name)}"}} {histogram.total}')
+        lines.append(f'task_alloc_span_seconds_count{{span="{_label(name)}"}} {histogram.count}')
+    for source, values in collect_stats().items():
+        gauges = []
+        _flatten(_metric_name(f"task_alloc_{source}"), values, gauges)
+        for metric, value in gauges:
+            metric = _metric_name(metric)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"